@@ -0,0 +1,45 @@
+"""Measure the cost of invalid input, printing errors or returning DniResult
+
+stdout is redirected to os.devnull while measuring, so only the cost of
+writing the errors is measured, not the one of a terminal showing them.
+
+Usage:
+    python3 -m benchmarks.benchmark_errors [num_calls]
+"""
+import contextlib
+import os
+import sys
+import time
+
+from dni_calculator import DniCalculatorProxy
+
+
+INVALID_DNIS = ("1X111111", "11.1F1.111", "", "111111?1", "1111111")
+
+
+def main(num_calls: int = 100_000) -> None:
+    dni_strs = [INVALID_DNIS[i % len(INVALID_DNIS)] for i in range(num_calls)]
+    print(f"{'mode':<12}{'calls/s':>12}{'ns/call':>10}")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        timings = [
+            (mode, _time_calls(DniCalculatorProxy(structured), dni_strs))
+            for mode, structured in (("print", False), ("structured", True))
+        ]
+    for mode, elapsed in timings:
+        ns_per_call = elapsed / num_calls * 1e9
+        print(f"{mode:<12}{num_calls / elapsed:>12,.0f}{ns_per_call:>10,.0f}")
+
+
+def _time_calls(dni_calc: DniCalculatorProxy, dni_strs, repeat: int = 5) -> float:
+    """Return the best time, in seconds, to call find_letter on dni_strs"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for dni_str in dni_strs:
+            dni_calc.find_letter(dni_str)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
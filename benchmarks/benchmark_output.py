@@ -0,0 +1,62 @@
+"""Measure how fast all possible dnis are written to a pipe
+
+Both modes write the same blocks of numbers, found beforehand with
+find_all_possible_number_blocks, so only the output is measured: printing
+a Dni per number, as the CLI used to, or formatting each block at once
+with Dni.format_block.
+
+Usage:
+    python3 -m benchmarks.benchmark_output [dni_str]
+"""
+from typing import List, Sequence
+import io
+import subprocess
+import sys
+import time
+
+from dni_calculator import Dni, DniCalculator, DniParser
+
+
+def main(dni_str: str = "1??????1H") -> None:
+    dni = DniParser().parse_dni(dni_str)
+    blocks = list(DniCalculator().find_all_possible_number_blocks(dni))
+    print(f"{'mode':<8}{'lines':>10}{'lines/s':>14}")
+    timings = []
+    for mode, write_dnis in (("print", _print_dnis), ("blocks", _write_blocks)):
+        with subprocess.Popen(
+            ["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL
+        ) as pipe:
+            start = time.perf_counter()
+            lines = write_dnis(dni, blocks, pipe.stdin)
+            pipe.stdin.close()
+            elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        print(f"{mode:<8}{lines:>10,}{lines / elapsed:>14,.0f}")
+    print(f"speedup: {timings[0] / timings[1]:.1f}x")
+
+
+def _print_dnis(dni: Dni, blocks: List[Sequence[int]], pipe: io.BufferedWriter) -> int:
+    output = io.TextIOWrapper(pipe, write_through=False)
+    lines = 0
+    for block in blocks:
+        for number in block:
+            print(Dni(number, dni.letter, nie=dni.nie), file=output)
+            lines += 1
+    output.flush()
+    output.detach()
+    return lines
+
+
+def _write_blocks(
+    dni: Dni, blocks: List[Sequence[int]], pipe: io.BufferedWriter
+) -> int:
+    lines = 0
+    for block in blocks:
+        pipe.write(Dni.format_block(block, dni.letter, dni.nie))
+        lines += len(block)
+    pipe.flush()
+    return lines
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
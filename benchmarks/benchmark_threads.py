@@ -0,0 +1,47 @@
+"""Measure how map_find_letter and map_validate scale with threads
+
+A single DniCalculatorProxy is shared by every thread. Speedups above 1
+are only expected on free-threaded builds of CPython, as otherwise the
+GIL lets a single thread run at a time.
+
+Usage:
+    python3 -m benchmarks.benchmark_threads [max_threads] [num_dnis]
+"""
+import os
+import random
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dni_calculator import DniCalculatorProxy
+
+
+def main(max_threads: int = os.cpu_count() or 1, num_dnis: int = 200_000) -> None:
+    dni_calc = DniCalculatorProxy()
+    rng = random.Random(0)
+    numbers = [f"{rng.randrange(10 ** 8):08d}" for _ in range(num_dnis)]
+    dnis = [str(dni) for dni in dni_calc.map_find_letter(numbers)]
+
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"Python {sys.version.split()[0]}, free-threaded: {free_threaded}")
+    print(f"{'method':<16}{'threads':>8}{'dnis/s':>12}{'speedup':>9}")
+    for method, dni_strs in (
+        (dni_calc.map_find_letter, numbers),
+        (dni_calc.map_validate, dnis),
+    ):
+        base_time = None
+        for threads in range(1, max_threads + 1):
+            with ThreadPoolExecutor(threads) as executor:
+                start = time.perf_counter()
+                method(dni_strs, executor=executor)
+                elapsed = time.perf_counter() - start
+            base_time = base_time or elapsed
+            print(
+                f"{method.__name__:<16}{threads:>8}{num_dnis / elapsed:>12,.0f}"
+                f"{base_time / elapsed:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
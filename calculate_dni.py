@@ -1,10 +1,110 @@
+import sys
+from typing import List, Optional, Union
+
 import fire
 
-from dni_calculator import DniCalculatorProxy
+from dni_calculator import DniCalculatorProxy, DniRegistry, DniResult, DniStatus
+
+
+class DniCalculatorCli:
+    """Command line interface to DniCalculatorProxy
+
+    Results are printed to stdout, one per line, and errors to stderr
+    """
+
+    def __init__(self, registry: Optional[str] = None, nie: bool = False):
+        """
+        Args:
+            registry: The path to a registry of known dnis. See
+                build_registry
+            nie: Whether every dni given is a NIE, whose prefix can be
+                unknown. See DniCalculatorProxy
+        """
+        self._dni_calc = DniCalculatorProxy(
+            structured=True,
+            registry=DniRegistry(registry) if registry is not None else None,
+            nie=nie,
+        )
+
+    def find_letter(self, dni_str: Union[str, int]) -> None:
+        """Find the letter corresponding to the given dni
+
+        See DniCalculatorProxy.find_letter
+        """
+        self._print_result(self._dni_calc.find_letter(dni_str))
+
+    def find_missing_num(self, dni_str: str) -> None:
+        """Find the first complete dni valid for the given dni_str
+
+        See DniCalculatorProxy.find_missing_num
+        """
+        self._print_result(self._dni_calc.find_missing_num(dni_str))
+
+    def find_all_possible_dnis(
+        self, dni_str: str, shard_index: int = 0, shard_count: int = 1
+    ) -> None:
+        """Find the all of the valid dnis for the given dni_str
+
+        Dnis are written in blocks. See
+        DniCalculatorProxy.find_all_possible_dni_blocks
+        """
+        for block in self._dni_calc.find_all_possible_dni_blocks(
+            dni_str, shard_index=shard_index, shard_count=shard_count
+        ):
+            if isinstance(block, bytes):
+                sys.stdout.buffer.write(block)
+            else:
+                self._print_result(block)
+
+    def find_registered_dnis(self, dni_str: str) -> None:
+        """Find the valid dnis for the given dni_str which are in the registry
+
+        See DniCalculatorProxy.find_registered_dnis
+        """
+        for result in self._dni_calc.find_registered_dnis(dni_str):
+            self._print_result(result)
+
+    def top_k_possible_dnis(
+        self, dni_str: str, weights: List[Optional[List[float]]], k: int = 10
+    ) -> None:
+        """Find the k valid dnis for the given dni_str most likely by weights
+
+        weights is a list with, for each '?', None or the weights of the
+        values from 0 to 9. See DniCalculatorProxy.top_k_possible_dnis
+        """
+        for result in self._dni_calc.top_k_possible_dnis(dni_str, weights, k):
+            self._print_result(result)
+
+    def build_registry(self, dnis_path: str, registry_path: str) -> None:
+        """Build a registry from a text file with a dni per line
+
+        See DniRegistry.build_from_file
+        """
+        DniRegistry.build_from_file(dnis_path, registry_path).close()
+
+    def validate(self, dni_str: Union[str, int]) -> bool:
+        """Check whether the given dni is complete and valid
+
+        See DniCalculatorProxy.validate
+        """
+        return self._dni_calc.validate(dni_str)
+
+    def _print_result(self, result: DniResult) -> None:
+        if result.status == DniStatus.ALREADY_VALID:
+            print(
+                f'The given dni is already complete and valid: "{result.dni}"',
+                file=sys.stderr,
+            )
+        if result.ok:
+            print(result.dni)
+        elif result.status == DniStatus.NOT_FOUND:
+            print("No valid dni found", file=sys.stderr)
+        else:
+            print(result.error, file=sys.stderr)
 
 
 def main():
-    fire.Fire(DniCalculatorProxy)
+    fire.Fire(DniCalculatorCli)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,17 @@
 from .dni import Dni, DniException
 from .dni_parser import DniParser, DniParseException
 from .dni_calculator import DniCalculator, DniCalculationException
+from .dni_result import DniResult, DniStatus
+from .dni_registry import DniRegistry, DniRegistryException
 from .dni_calculator_proxy import DniCalculatorProxy
+from .dni_engine import (
+    DniEngine,
+    BruteForceEngine,
+    ArithmeticEngine,
+    NumpyEngine,
+    ProcessPoolEngine,
+    AutoEngine,
+    DifferentialEngine,
+    DniEnginePlanner,
+)
+from .dni_incremental_validator import DniIncrementalValidator
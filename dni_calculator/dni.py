@@ -1,22 +1,30 @@
 from dataclasses import dataclass, field
-from typing import ClassVar, Optional, List
+from typing import ClassVar, Optional, List, Sequence
 
 
 @dataclass
 class Dni:
+    """A dni, or a NIE if nie is True
+
+    The prefix of a NIE (X, Y or Z) is kept as the first digit of its
+    number (0, 1 or 2), which is how its letter is calculated. For
+    example, X1234567L is Dni(1_234_567, "L", nie=True)
+    """
 
     LENGTH_NUMS_ONLY: ClassVar[int] = 8
     LENGTH: ClassVar[int] = LENGTH_NUMS_ONLY + 1
+    NIE_PREFIXES: ClassVar[str] = "XYZ"
 
     number: Optional[int] = None
     letter: Optional[str] = None
     missing_digits: List[int] = field(default_factory=lambda: [])
+    nie: bool = False
 
     def get_number_as_str(self) -> str:
         """Return the number representing unknown digits as "?"
 
         For example, if number=11_011_111 and missing_digits=[2],
-        returned value is "11?11111"
+        returned value is "11?11111". NIEs start with their prefix instead
         """
         number = self.number if self.number is not None else 0
         number_as_str = str(number).zfill(Dni.LENGTH_NUMS_ONLY)
@@ -26,6 +34,8 @@ class Dni:
         if self.missing_digits:
             for missing_digit in self.missing_digits:
                 number_as_list[missing_digit] = "?"
+        if self.nie and number_as_list[0] != "?":
+            number_as_list[0] = self.NIE_PREFIXES[int(number_as_list[0])]
 
         return "".join(number_as_list)
 
@@ -36,11 +46,46 @@ class Dni:
     def __str__(self):
         return self.get_number_as_str() + self.get_letter_as_str()
 
+    @staticmethod
+    def format_block(numbers: Sequence[int], letter: str, nie: bool = False) -> bytes:
+        """Return the lines "NNNNNNNNL\\n" of every number, as a single buffer
+
+        Equivalent to joining f"{Dni(number, letter)}\\n" for every number,
+        but formatting all of them at once.
+
+        Example:
+            format_block([1_111_111, 11_111_111], "h") -> b"01111111H\\n11111111H\\n"
+
+        Args:
+            numbers: Complete numbers, as a sequence or a numpy array
+            letter: The letter shared by every number
+            nie: Whether the numbers are of NIEs, so that their first
+                digit is written as their prefix
+        """
+        if hasattr(numbers, "tolist"):
+            numbers = numbers.tolist()
+        line_format = f"%0{Dni.LENGTH_NUMS_ONLY}d{letter.upper()}\n"
+        block = (line_format * len(numbers) % tuple(numbers)).encode("ascii")
+        if not nie:
+            return block
+        # Lines have a fixed length, so the prefixes are replaced all at once
+        block = bytearray(block)
+        line_length = Dni.LENGTH + 1
+        block[::line_length] = block[::line_length].translate(_NIE_PREFIXES_TABLE)
+        return bytes(block)
+
     def __repr__(self) -> str:
-        return f"Dni(number={self.number}, letter={self.letter}, missing_digits={self.missing_digits})"
+        nie = ", nie=True" if self.nie else ""
+        return f"Dni(number={self.number}, letter={self.letter}, missing_digits={self.missing_digits}{nie})"
 
     def copy(self):
-        return Dni(self.number, self.letter, [i for i in self.missing_digits])
+        return Dni(self.number, self.letter, [i for i in self.missing_digits], self.nie)
+
+
+_NIE_PREFIXES_TABLE = bytes.maketrans(
+    "".join(map(str, range(len(Dni.NIE_PREFIXES)))).encode("ascii"),
+    Dni.NIE_PREFIXES.encode("ascii"),
+)
 
 
 class DniException(Exception):
@@ -1,12 +1,75 @@
-from typing import Iterable, Generator
+from typing import (
+    Dict,
+    Iterable,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+import bisect
+import heapq
 import itertools
-
-from dni_calculator import Dni, DniException
+import math
+import operator
+
+from dni_calculator import Dni
+from dni_calculator.dni_digits import (
+    DEFAULT_BLOCK_SIZE,
+    MODULUS,
+    DniCalculationException,
+    clear_digits,
+    count_valid_numbers,
+    get_completion_counts,
+    get_digits_values,
+    get_generator_for_digit,
+    get_generator_for_digits,
+    get_generator_for_digits_from,
+    get_letter,
+    get_letter_residue,
+    get_nth_completion,
+    get_place_values,
+)
+from dni_calculator.dni_engine import ArithmeticEngine, DniEngine
+
+if TYPE_CHECKING:
+    from dni_calculator.dni_registry import DniRegistry
 
 
 class DniCalculator:
+    """Find the missing information of Dni instances
+
+    A DniCalculator is immutable once created: its settings cannot be
+    changed and no state is kept between calls, as every returned Dni is
+    a new instance. A single DniCalculator can therefore be shared by
+    several threads, as long as its engine is not modified either (for
+    example, by calibrating a DniEnginePlanner while in use).
+    """
 
-    _LETTERS = "TRWAGMYFPDXBNJZSQVHLCKET"
+    DEFAULT_BLOCK_SIZE = DEFAULT_BLOCK_SIZE
+
+    def __init__(
+        self, engine: Optional[DniEngine] = None, verbose: bool = True
+    ) -> None:
+        """
+        Args:
+            engine: The DniEngine used to find missing numbers. By
+                default, every possible number is checked one by one.
+                See dni_engine for the available engines
+            verbose: Whether to print a message when the given dni is
+                already complete and valid
+        """
+        self._engine = engine
+        self._verbose = verbose
+
+    @property
+    def engine(self) -> Optional[DniEngine]:
+        return self._engine
+
+    @property
+    def verbose(self) -> bool:
+        return self._verbose
 
     def find_letter(self, dni: Dni) -> Dni:
         """Find the letter corresponding to the given dni
@@ -29,7 +92,8 @@ class DniCalculator:
             )
         if dni.letter is not None:
             if self._check_valid(dni):
-                print(f'The given dni is already complete and valid: "{dni}"')
+                if self.verbose:
+                    print(f'The given dni is already complete and valid: "{dni}"')
                 return dni.copy()
             else:
                 raise DniCalculationException(
@@ -45,7 +109,7 @@ class DniCalculator:
 
     def _get_letter(self, dni_number: int) -> str:
         """Return the letter corresponding to the given dni_number"""
-        return self._LETTERS[dni_number % 23]
+        return get_letter(dni_number)
 
     def _check_valid(self, dni: Dni) -> bool:
         """Check whether the given dni is valid
@@ -80,11 +144,178 @@ class DniCalculator:
             DniCalculationException: if no letter is given or all
                 digits are provided
         """
-        return next(self.find_all_possible_dnis(dni))
+        if self.engine is None or not dni.missing_digits:
+            return next(self.find_all_possible_dnis(dni))
+
+        self._check_can_find_missing_num(dni)
+        number = self.engine.find_first_number(dni)
+        if number is None:
+            raise DniCalculationException(f'No valid dni found for "{dni}"')
+        return Dni(number, dni.letter, nie=dni.nie)
+
+    def count_possible_dnis(self, dni: Dni) -> int:
+        """Count the valid dnis for the given dni without finding them
+
+        Args:
+            dni: The dni for which to count the missing numbers.
+                See find_all_possible_dnis
+
+        Raises:
+            DniCalculationException: if no letter is given or all
+                digits are provided
+        """
+        self._check_can_find_missing_num(dni)
+        if not dni.missing_digits:
+            return 1
+        if self.engine is not None:
+            return self.engine.count(dni)
+        return count_valid_numbers(dni)
+
+    def count_possible_dnis_by_prefix(
+        self, dni: Dni, prefix_length: int
+    ) -> Dict[int, int]:
+        """Count the valid dnis for the given dni by their first digits
+
+        Dnis are not found. Instead, the dnis starting with each prefix are
+        counted at once, so it takes time proportional to the number of
+        prefixes.
+
+        Example:
+            count_possible_dnis_by_prefix(Dni(1234, "K", [0, 1, 2, 3]), 2)
+            -> {0: 4, 1: 5, 2: 4, 3: 5, ..., 99: 4}
+
+        Args:
+            dni: The dni for which to count the missing numbers.
+                See find_all_possible_dnis
+            prefix_length: The number of leading digits dnis are grouped
+                by, from 0 to Dni.LENGTH_NUMS_ONLY
+
+        Returns:
+            The number of valid dnis for each prefix with any, in
+            increasing order of prefix. The prefix of NIEs counts as
+            their first digit (see Dni)
+
+        Raises:
+            DniCalculationException: if no letter is given, all
+                digits are provided and the dni is not valid, or
+                prefix_length is not valid
+        """
+        self._check_can_find_missing_num(dni)
+        if not 0 <= prefix_length <= Dni.LENGTH_NUMS_ONLY:
+            raise DniCalculationException(
+                f"prefix_length should be from 0 to {Dni.LENGTH_NUMS_ONLY}. "
+                f"Got {prefix_length}"
+            )
+        prefix_divisor = 10 ** (Dni.LENGTH_NUMS_ONLY - prefix_length)
+        if not dni.missing_digits:
+            return {dni.number // prefix_divisor: 1}
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return {}
+
+        dni = self._sort_missing_digits(dni)
+        place_values = get_place_values(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        completion_counts = get_completion_counts(place_values, digits_values)
+        num_prefix_digits = bisect.bisect_left(dni.missing_digits, prefix_length)
+        suffix_counts = completion_counts[num_prefix_digits]
+        counts = {}
+        for digits in itertools.product(*digits_values[:num_prefix_digits]):
+            number = dni.number + sum(map(operator.mul, digits, place_values))
+            count = suffix_counts[(residue - number) % MODULUS]
+            if count:
+                counts[number // prefix_divisor] = count
+        return counts
+
+    def count_possible_dnis_in_range(self, dni: Dni, lower: int, upper: int) -> int:
+        """Count the valid dnis for the given dni in [lower, upper)
+
+        Dnis are not found. Instead, they are counted digit by digit,
+        comparing them with lower and upper.
+
+        Example:
+            count_possible_dnis_in_range(
+                Dni(1234, "K", [0, 1, 2, 3]), 30_000_000, 40_000_000
+            ) -> 43
+
+        Args:
+            dni: The dni for which to count the missing numbers.
+                See find_all_possible_dnis
+            lower: The lowest dni number to count
+            upper: The number after the highest dni number to count
+
+        Raises:
+            DniCalculationException: if no letter is given or all
+                digits are provided and the dni is not valid
+        """
+        self._check_can_find_missing_num(dni)
+        if lower >= upper:
+            return 0
+        lower_count = self._count_possible_dnis_below(dni, lower)
+        return self._count_possible_dnis_below(dni, upper) - lower_count
+
+    def _count_possible_dnis_below(self, dni: Dni, bound: int) -> int:
+        """Count the valid dnis for the given dni lower than bound
 
-    def find_all_possible_dnis(self, dni: Dni) -> Generator[Dni, None, None]:
+        Args:
+            dni: A dni for which missing numbers can be looked for.
+                See _check_can_find_missing_num
+            bound: The number after the highest dni number to count
+        """
+        if bound <= 0:
+            return 0
+        if bound >= 10 ** Dni.LENGTH_NUMS_ONLY:
+            return self.count_possible_dnis(dni)
+        if not dni.missing_digits:
+            return int(dni.number < bound)
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return 0
+
+        # Dnis lower than bound share its first digits, up to one which is
+        # lower. For every such digit, the dnis sharing the digits before
+        # it are counted at once
+        dni = self._sort_missing_digits(dni)
+        place_values = get_place_values(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        completion_counts = get_completion_counts(place_values, digits_values)
+        number = dni.number
+        count = 0
+        i = 0
+        for pos, place_value in enumerate(
+            get_place_values(range(Dni.LENGTH_NUMS_ONLY))
+        ):
+            bound_digit = bound // place_value % 10
+            if i < len(dni.missing_digits) and dni.missing_digits[i] == pos:
+                digit_values = digits_values[i]
+                i += 1
+                for digit in digit_values:
+                    if digit >= bound_digit:
+                        break
+                    needed_residue = residue - number - digit * place_value
+                    count += completion_counts[i][needed_residue % MODULUS]
+                if bound_digit not in digit_values:
+                    return count
+                number += bound_digit * place_value
+                continue
+            digit = dni.number // place_value % 10
+            if digit != bound_digit:
+                if digit < bound_digit:
+                    count += completion_counts[i][(residue - number) % MODULUS]
+                return count
+        return count
+
+    def find_all_possible_dnis(
+        self, dni: Dni, shard_index: int = 0, shard_count: int = 1
+    ) -> Generator[Dni, None, None]:
         """Find the all of the valid dnis for the given dni
 
+        The valid dnis can be split among shard_count independent
+        workers. Each shard yields a contiguous slice of the valid dnis,
+        all shards getting the same amount of them (give or take one).
+        Concatenating the output of shards 0, 1, ..., shard_count - 1
+        gives the same output as a single shard.
+
         Args:
             dni: The dni for which to find the missing numbers
 
@@ -94,80 +325,445 @@ class DniCalculator:
                 Examples:
                     Dni(11_111_011, 'H', [5])
                     Dni(11_100_111, 'H', [3, 4])
+            shard_index: The shard to find, from 0 to shard_count - 1
+            shard_count: The number of shards the valid dnis are split into
 
         Raises:
-            DniCalculationException: if no letter is given or all
-                digits are provided
+            DniCalculationException: if no letter is given, all
+                digits are provided or the shard is not valid
         """
-        if dni.letter is None:
-            raise DniCalculationException(
-                f'Cannot fing missing numbers if no letter is given: "{dni}"'
-            )
+        self._check_shard(shard_index, shard_count)
+        self._check_can_find_missing_num(dni)
 
         num_missing_digits = len(dni.missing_digits)
         if num_missing_digits == 0:
-            if self._check_valid(dni):
-                print(f'The given dni is already complete and valid: "{dni}"')
+            lower, upper = self._get_shard_bounds(1, shard_index, shard_count)
+            if lower < upper:
+                if self.verbose:
+                    print(f'The given dni is already complete and valid: "{dni}"')
                 yield dni.copy()
-                return None
-            else:
-                raise DniCalculationException(
-                    f'All digits provided. Unable to find missing ones "{dni}"'
-                )
+            return None
+
+        if shard_count != 1:
+            yield from self._find_shard_of_possible_dnis(dni, shard_index, shard_count)
+            return None
+
+        if self.engine is not None:
+            res_dni = Dni(letter=dni.letter, nie=dni.nie)
+            for number in self.engine.find_all_numbers(dni):
+                res_dni.number = number
+                yield res_dni.copy()
+            return None
 
         res_dni = dni.copy()
         missing_digits = res_dni.missing_digits
         res_dni.missing_digits = []
         prev_digits_to_check = 0
-        for digits_to_check in self._get_generator_for_digits(missing_digits):
+        for digits_to_check in self._get_generator_for_digits(
+            missing_digits, get_digits_values(dni)
+        ):
             res_dni.number -= prev_digits_to_check
             res_dni.number += digits_to_check
             prev_digits_to_check = digits_to_check
             if self._check_valid(res_dni):
                 yield res_dni.copy()
 
-    def _get_generator_for_digit(self, digit_pos: int) -> Generator[int, None, None]:
-        """Return the different value the digit at position digit_pos can have
+    def find_all_possible_number_blocks(
+        self,
+        dni: Dni,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> Generator[Sequence[int], None, None]:
+        """Like find_all_possible_dnis, but yielding blocks of numbers
 
-        Examples:
-            digit_pos=7 -> 0, 1, 2, ..., 8, 9
-            digit_pos=6 -> 0, 10, 20, ..., 80, 90
-            digit_pos=0 -> 0, 10_000_000, ..., 90_000_000
+        Blocks contain block_size numbers, except for the last one, which
+        may contain fewer. All of them share the letter of the given dni.
+        Use Dni.format_block to write them.
+
+        Uses the engine, if given, or ArithmeticEngine otherwise
+
+        Raises:
+            DniCalculationException: if no letter is given, all
+                digits are provided or the shard is not valid
+        """
+        if block_size < 1:
+            raise DniCalculationException(
+                f"Block size has to be positive. Got {block_size}"
+            )
+        self._check_shard(shard_index, shard_count)
+        self._check_can_find_missing_num(dni)
+        if not dni.missing_digits:
+            dnis = self.find_all_possible_dnis(dni, shard_index, shard_count)
+            numbers = (res_dni.number for res_dni in dnis)
+            while True:
+                block = list(itertools.islice(numbers, block_size))
+                if not block:
+                    return None
+                yield block
+
+        engine = self.engine if self.engine is not None else ArithmeticEngine()
+        if shard_count == 1:
+            yield from engine.find_number_blocks(dni, block_size)
+            return None
+
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        completion_counts = get_completion_counts(
+            get_place_values(dni.missing_digits), get_digits_values(dni)
+        )
+        total = completion_counts[0][(residue - dni.number) % MODULUS]
+        lower, upper = self._get_shard_bounds(total, shard_index, shard_count)
+        block: List[int] = []
+        for sub_dni in self._split_possible_dnis(
+            dni, completion_counts, residue, lower, upper
+        ):
+            if sub_dni.missing_digits:
+                sub_blocks = engine.find_number_blocks(sub_dni, block_size)
+            else:
+                sub_blocks = [[sub_dni.number]]
+            for sub_block in sub_blocks:
+                block.extend(sub_block)
+                offset = 0
+                while len(block) - offset >= block_size:
+                    yield block[offset : offset + block_size]
+                    offset += block_size
+                del block[:offset]
+        if block:
+            yield block
+
+    def top_k_possible_dnis(
+        self, dni: Dni, weights: Sequence[Optional[Sequence[float]]], k: int
+    ) -> List[Dni]:
+        """Find the k valid dnis most likely according to weights
+
+        The likelihood of a dni is the product of the weights of the values
+        of its missing digits. Dnis are searched best first, only following
+        digit values which can still lead to a valid dni, so the number of
+        steps depends on k and not on the number of valid dnis.
+
+        Example:
+            top_k_possible_dnis(
+                Dni(5240700, "Q", [6, 7]),
+                [None, [0.3, 0, 0, 0.6, 0.1, 0, 0, 0, 0, 0]],
+                2,
+            ) -> [Dni(5240773, "Q"), Dni(5240750, "Q")]
 
         Args:
-            digit_pos: A number from 0 to 9
+            dni: The dni for which to find the missing numbers.
+                See find_all_possible_dnis
+            weights: For each missing digit, in the order of
+                dni.missing_digits, the weight (such as its probability)
+                of each value from 0 to 9. None if all values are equally
+                likely. Values with weight 0 are never used, nor are values
+                other than 0, 1 and 2 for the prefix of NIEs
+            k: The maximum number of dnis to find
+
+        Returns:
+            The dnis, from most to least likely
+
+        Raises:
+            DniCalculationException: if no letter is given, all
+                digits are provided or weights are not valid
         """
-        power = Dni.LENGTH_NUMS_ONLY - digit_pos
-        for number in range(0, 10 ** power, 10 ** (power - 1)):
-            yield number
+        self._check_can_find_missing_num(dni)
+        costs = self._get_digits_costs(dni, weights)
+        if k < 0:
+            raise DniCalculationException(f"k cannot be negative. Got {k}")
+        if not dni.missing_digits:
+            return [dni.copy()][:k]
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return []
+
+        # Costs are -log(weight), so the most likely dnis are the cheapest.
+        # min_costs[i] is the lowest cost digits i, i+1, ... can add up to,
+        # which never overestimates the cost left to complete a dni
+        num_missing_digits = len(dni.missing_digits)
+        place_values = get_place_values(dni.missing_digits)
+        digits_values = [list(digit_costs) for digit_costs in costs]
+        completion_counts = get_completion_counts(place_values, digits_values)
+        min_costs = [0.0] * (num_missing_digits + 1)
+        for i in reversed(range(num_missing_digits)):
+            min_costs[i] = min_costs[i + 1] + min(costs[i].values(), default=0.0)
+
+        needed_residue = (residue - dni.number) % MODULUS
+        if completion_counts[0][needed_residue] == 0:
+            return []
+        # Ties are broken by the longest partial dni, to find complete ones
+        # sooner, and then by the lowest number
+        heap = [(min_costs[0], 0, dni.number, needed_residue, 0.0)]
+        res_dnis: List[Dni] = []
+        while heap and len(res_dnis) < k:
+            _, negative_depth, number, needed_residue, cost = heapq.heappop(heap)
+            i = -negative_depth
+            if i == num_missing_digits:
+                res_dnis.append(Dni(number, dni.letter, nie=dni.nie))
+                continue
+            place_residue = place_values[i] % MODULUS
+            for digit, digit_cost in costs[i].items():
+                residue = (needed_residue - digit * place_residue) % MODULUS
+                if completion_counts[i + 1][residue] == 0:
+                    continue
+                next_cost = cost + digit_cost
+                heapq.heappush(
+                    heap,
+                    (
+                        next_cost + min_costs[i + 1],
+                        negative_depth - 1,
+                        number + digit * place_values[i],
+                        residue,
+                        next_cost,
+                    ),
+                )
+        return res_dnis
 
-    def _get_generator_for_digits(
-        self, digits_pos: Iterable[int]
-    ) -> Generator[int, None, None]:
-        """Returns all combinations of values the digits at position digits_pos can have
+    def _get_digits_costs(
+        self, dni: Dni, weights: Sequence[Optional[Sequence[float]]]
+    ) -> List[Dict[int, float]]:
+        """Return, for each missing digit, the cost of each of its values
 
-        Examples:
-            digit_pos=(7,) -> 0, 1, 2, ..., 8, 9
-            digit_pos=(6,) -> 0, 10, 20, ..., 80, 90
-            digit_pos=(0,) -> 0, 10_000_000, ..., 90_000_000
-            digit_pos=(6, 7) -> 0, 1, 2, ..., 98, 99
-            digit_pos=(5, 7) -> 0, 1, 2, ..., 9, 100, 101, ... 109, 200, ..., 908, 909
-            digit_pos=(0, 5) -> 0, 10_000_000, 10_000_100, 10_000_200, ..., 90_000_900
+        The cost is -log(weight). Values with weight 0 are left out
+
+        Raises:
+            DniCalculationException: if weights are not valid
+        """
+        if len(weights) != len(dni.missing_digits):
+            raise DniCalculationException(
+                f"Expected weights for {len(dni.missing_digits)} missing digits. "
+                f"Got {len(weights)}"
+            )
+        costs = []
+        for digit_weights, digit_values in zip(weights, get_digits_values(dni)):
+            if digit_weights is None:
+                digit_weights = [1.0] * 10
+            if len(digit_weights) != 10 or not all(
+                0 <= weight < math.inf for weight in digit_weights
+            ):
+                raise DniCalculationException(
+                    f"Weights should be 10 non negative numbers. Got {digit_weights}"
+                )
+            costs.append(
+                {
+                    digit: -math.log(weight)
+                    for digit, weight in enumerate(digit_weights)
+                    if weight > 0 and digit in digit_values
+                }
+            )
+        return costs
+
+    def find_registered_dnis(
+        self, dni: Dni, registry: "DniRegistry"
+    ) -> Generator[Dni, None, None]:
+        """Find the valid dnis for the given dni which are in registry
+
+        Whichever is smaller is walked: either the valid dnis, looked up
+        in the registry, or the registry numbers between the lowest and
+        highest possible dnis, checked against the given dni.
+
+        Valid dnis are found with the engine, if given, or ArithmeticEngine
+        otherwise
 
         Args:
-            digits_pos: An iterable whose values have to be between 0 and 9
-                For the output to be in an expectable order, the iterable
-                has to return the numbers in increasing order.
+            dni: The dni for which to find the missing numbers.
+                See find_all_possible_dnis
+            registry: The registry of known dnis
+
+        Raises:
+            DniCalculationException: if no letter is given, all
+                digits are provided or dni is a NIE, as registries only
+                hold dnis
+        """
+        self._check_can_find_missing_num(dni)
+        if dni.nie:
+            raise DniCalculationException(
+                f'Registries only hold dnis. Cannot look for NIE "{dni}"'
+            )
+        place_values = get_place_values(dni.missing_digits)
+        lower = dni.number
+        upper = dni.number + 9 * sum(place_values)
+        start, end = registry.get_range_bounds(lower, upper)
+        # Counted with the completion counts whatever the engine is, as
+        # some engines count by finding every number
+        if end - start < count_valid_numbers(dni):
+            residue = get_letter_residue(dni.letter)
+            numbers: Iterable[int] = (
+                number
+                for number in registry.find_in_range(lower, upper)
+                if number % MODULUS == residue
+                and clear_digits(number, place_values) == dni.number
+            )
+        elif not dni.missing_digits:
+            numbers = registry.intersect([dni.number])
+        else:
+            engine = self.engine if self.engine is not None else ArithmeticEngine()
+            numbers = registry.intersect(engine.find_all_numbers(dni))
+
+        res_dni = Dni(letter=dni.letter)
+        for number in numbers:
+            res_dni.number = number
+            yield res_dni.copy()
 
-                For example, if digits_pos=(7, 6), the yielded values will be:
-                0, 10, 20, 30, ... 90, 1, 11, 21, ...
+    def _check_can_find_missing_num(self, dni: Dni) -> None:
+        """Check missing numbers can be looked for in the given dni
+
+        Raises:
+            DniCalculationException: if no letter is given or all
+                digits are provided and the dni is not valid
         """
-        digits_generators = [
-            self._get_generator_for_digit(digit_pos) for digit_pos in digits_pos
-        ]
-        digits_generator = itertools.product(*digits_generators)
-        yield from map(sum, digits_generator)
+        if dni.letter is None:
+            raise DniCalculationException(
+                f'Cannot fing missing numbers if no letter is given: "{dni}"'
+            )
+        if not dni.missing_digits and not self._check_valid(dni):
+            raise DniCalculationException(
+                f'All digits provided. Unable to find missing ones "{dni}"'
+            )
 
+    def _check_shard(self, shard_index: int, shard_count: int) -> None:
+        """Check shard_index is a valid shard out of shard_count shards
 
-class DniCalculationException(DniException):
-    """Exception calculating a Dni missing information"""
+        Raises:
+            DniCalculationException: if the shard is not valid
+        """
+        if shard_count < 1:
+            raise DniCalculationException(
+                f"There has to be at least one shard. Got {shard_count}"
+            )
+        if not 0 <= shard_index < shard_count:
+            raise DniCalculationException(
+                f"Shard index has to be between 0 and {shard_count - 1}. "
+                f"Got {shard_index}"
+            )
+
+    def _get_shard_bounds(
+        self, total: int, shard_index: int, shard_count: int
+    ) -> Tuple[int, int]:
+        """Return the [lower, upper) range of results belonging to a shard
+
+        Example:
+            total=10, shard_count=3 -> (0, 3), (3, 6), (6, 10)
+        """
+        return (
+            shard_index * total // shard_count,
+            (shard_index + 1) * total // shard_count,
+        )
+
+    def _find_shard_of_possible_dnis(
+        self, dni: Dni, shard_index: int, shard_count: int
+    ) -> Generator[Dni, None, None]:
+        """Find the valid dnis belonging to the given shard
+
+        The first valid dni of the shard is found straight away from the
+        number of valid dnis each digit leads to, so only the candidates
+        between the first and last valid dnis of the shard are checked.
+
+        Args:
+            dni: A Dni with letter and at least one missing digit
+        """
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        place_values = get_place_values(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        completion_counts = get_completion_counts(place_values, digits_values)
+        needed_residue = (residue - dni.number) % MODULUS
+        total = completion_counts[0][needed_residue]
+        lower, upper = self._get_shard_bounds(total, shard_index, shard_count)
+        if lower >= upper:
+            return None
+
+        start_digits = get_nth_completion(
+            place_values, completion_counts, needed_residue, lower, digits_values
+        )
+        res_dni = dni.copy()
+        res_dni.missing_digits = []
+        remaining = upper - lower
+        for number in get_generator_for_digits_from(
+            dni.number, place_values, start_digits, digits_values
+        ):
+            if number % MODULUS == residue:
+                res_dni.number = number
+                yield res_dni.copy()
+                remaining -= 1
+                if remaining == 0:
+                    return None
+
+    def _split_possible_dnis(
+        self,
+        dni: Dni,
+        completion_counts: Sequence[Sequence[int]],
+        residue: int,
+        lower: int,
+        upper: int,
+    ) -> Generator[Dni, None, None]:
+        """Split the valid dnis from the lower-th to the upper-th, excluded
+
+        The first missing digits are fixed, from the number of valid dnis
+        each digit leads to, until every valid dni of the resulting dnis
+        is in the range. So there are at most 2 * 10 of them per digit.
+
+        Args:
+            dni: A Dni with letter
+            completion_counts: The table returned by get_completion_counts
+                for the missing digits of dni
+            residue: The residue of the letter of dni
+            lower: The index of the first valid dni
+            upper: The index after the last valid dni
+        """
+        if lower >= upper:
+            return None
+        if (
+            lower == 0
+            and upper >= completion_counts[0][(residue - dni.number) % MODULUS]
+        ):
+            yield dni
+            return None
+
+        (place_value,) = get_place_values(dni.missing_digits[:1])
+        for digit in get_digits_values(dni)[0]:
+            sub_dni = Dni(
+                dni.number + digit * place_value,
+                dni.letter,
+                dni.missing_digits[1:],
+                dni.nie,
+            )
+            sub_total = completion_counts[1][(residue - sub_dni.number) % MODULUS]
+            yield from self._split_possible_dnis(
+                sub_dni,
+                completion_counts[1:],
+                residue,
+                max(lower, 0),
+                min(upper, sub_total),
+            )
+            lower -= sub_total
+            upper -= sub_total
+            if upper <= 0:
+                return None
+
+    def _sort_missing_digits(self, dni: Dni) -> Dni:
+        """Return a copy of dni with its missing digits in increasing order"""
+        res_dni = dni.copy()
+        res_dni.missing_digits = sorted(dni.missing_digits)
+        return res_dni
+
+    def _get_generator_for_digit(
+        self, digit_pos: int, digit_values: range = range(10)
+    ) -> Generator[int, None, None]:
+        """Return the different value the digit at position digit_pos can have
+
+        See dni_digits.get_generator_for_digit
+        """
+        return get_generator_for_digit(digit_pos, digit_values)
+
+    def _get_generator_for_digits(
+        self,
+        digits_pos: Iterable[int],
+        digits_values: Optional[Iterable[range]] = None,
+    ) -> Generator[int, None, None]:
+        """Returns all combinations of values the digits at position digits_pos can have
+
+        See dni_digits.get_generator_for_digits
+        """
+        return get_generator_for_digits(digits_pos, digits_values)
@@ -1,14 +1,89 @@
-from typing import Union, Generator, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    Callable,
+    Iterable,
+    List,
+    Union,
+    Generator,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
-from dni_calculator import Dni, DniParser, DniCalculator, DniException
+from dni_calculator import (
+    Dni,
+    DniParser,
+    DniCalculator,
+    DniException,
+    DniResult,
+    DniStatus,
+    DniRegistry,
+)
+from dni_calculator.dni_digits import get_letter
+
+T = TypeVar("T")
 
 
 class DniCalculatorProxy:
-    def __init__(self):
-        self.parser = DniParser()
-        self.dni_calc = DniCalculator()
+    """Find the missing information of dnis given as strings
+
+    A DniCalculatorProxy is immutable once created, and so are its
+    DniParser and DniCalculator. A single instance can be shared by
+    several threads. map_find_letter and map_validate make use of that
+    to spread large batches over a thread pool.
+
+    By default, errors are printed and None is returned instead of a Dni.
+    If structured is True, nothing is printed and every call returns a
+    DniResult instead, leaving the formatting of errors to the caller.
+
+    Dnis are parsed with DniParser.parse_dni, which recognizes NIEs by their
+    prefix. If nie is True, they are parsed with DniParser.parse_nie instead,
+    so that every input has to be a NIE and its prefix can be unknown.
+    """
+
+    DEFAULT_CHUNK_SIZE = 1024
+
+    def __init__(
+        self,
+        structured: bool = False,
+        registry: Optional[DniRegistry] = None,
+        nie: bool = False,
+    ):
+        """
+        Args:
+            structured: Whether to return DniResult instead of printing
+                errors
+            registry: The registry of known dnis used by
+                find_registered_dnis
+            nie: Whether every input has to be a NIE
+        """
+        self._structured = structured
+        self._registry = registry
+        self._nie = nie
+        self._parser = DniParser()
+        self._dni_calc = DniCalculator(verbose=not structured)
+
+    @property
+    def parser(self) -> DniParser:
+        return self._parser
+
+    @property
+    def dni_calc(self) -> DniCalculator:
+        return self._dni_calc
+
+    @property
+    def structured(self) -> bool:
+        return self._structured
+
+    @property
+    def registry(self) -> Optional[DniRegistry]:
+        return self._registry
+
+    @property
+    def nie(self) -> bool:
+        return self._nie
 
-    def find_letter(self, dni_str: Union[str, int]) -> Optional[Dni]:
+    def find_letter(self, dni_str: Union[str, int]) -> Union[Optional[Dni], DniResult]:
         """Find the letter corresponding to the given dni
 
         Examples:
@@ -19,13 +94,104 @@ class DniCalculatorProxy:
             dni_str: The dni written as a number
         """
         try:
-            dni = self.parser.parse_dni_without_letter(dni_str)
-            return self.dni_calc.find_letter(dni)
+            if self.nie:
+                dni = self.parser.parse_nie_without_letter(dni_str)
+            else:
+                dni = self.parser.parse_dni_without_letter(dni_str)
+            res_dni = self.dni_calc.find_letter(dni)
         except DniException as e:
-            print(e)
-            return None
+            return self._handle_exception(e)
+        return DniResult(DniStatus.OK, res_dni) if self.structured else res_dni
+
+    def validate(self, dni_str: Union[str, int]) -> bool:
+        """Check whether the given dni is complete and valid
+
+        Examples:
+            validate 11111111H -> True
+            validate 11111111G -> False
+            validate 1111111?H -> False
+
+        Args:
+            dni_str: The dni, including its letter. See DniParser
+        """
+        try:
+            dni = self._parse(dni_str)
+        except DniException:
+            return False
+        return (
+            not dni.missing_digits
+            and dni.letter is not None
+            and get_letter(dni.number) == dni.letter
+        )
+
+    def map_find_letter(
+        self,
+        dni_strs: Iterable[Union[str, int]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> List[Union[Optional[Dni], DniResult]]:
+        """Call find_letter for each of dni_strs, using a thread pool
+
+        Args:
+            dni_strs: The dnis to find the letter of
+            chunk_size: The number of dnis sent to a thread at once
+            max_workers: The number of threads of the pool created if
+                no executor is given
+            executor: The pool to use, instead of creating a new one
+
+        Raises:
+            DniException: if chunk_size is not positive
+        """
+        return self._map(self.find_letter, dni_strs, chunk_size, max_workers, executor)
+
+    def map_validate(
+        self,
+        dni_strs: Iterable[Union[str, int]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> List[bool]:
+        """Call validate for each of dni_strs, using a thread pool
+
+        See map_find_letter for the arguments
+        """
+        return self._map(self.validate, dni_strs, chunk_size, max_workers, executor)
+
+    def _map(
+        self,
+        function: Callable[[Union[str, int]], T],
+        dni_strs: Iterable[Union[str, int]],
+        chunk_size: int,
+        max_workers: Optional[int],
+        executor: Optional[Executor],
+    ) -> List[T]:
+        """Call function for each of dni_strs, in chunks of chunk_size
+
+        Results are returned in the same order as dni_strs
+
+        Raises:
+            DniException: if chunk_size is not positive
+        """
+        if chunk_size < 1:
+            raise DniException(f"chunk_size has to be positive. Got {chunk_size}")
+        if executor is None:
+            with ThreadPoolExecutor(max_workers) as executor:
+                return self._map(function, dni_strs, chunk_size, max_workers, executor)
+
+        dni_strs = list(dni_strs)
+        chunks = [
+            dni_strs[start : start + chunk_size]
+            for start in range(0, len(dni_strs), chunk_size)
+        ]
+
+        def map_chunk(chunk: List[Union[str, int]]) -> List[T]:
+            return [function(dni_str) for dni_str in chunk]
 
-    def find_missing_num(self, dni_str: str) -> Optional[Dni]:
+        results = executor.map(map_chunk, chunks)
+        return [result for chunk in results for result in chunk]
+
+    def find_missing_num(self, dni_str: str) -> Union[Optional[Dni], DniResult]:
         """Find the first complete dni valid for the given dni_str
 
         Args:
@@ -41,11 +207,16 @@ class DniCalculatorProxy:
 
                 For further details, see DniParser
         """
-        return next(self.find_all_possible_dnis(dni_str), None)
+        not_found = DniResult(DniStatus.NOT_FOUND) if self.structured else None
+        return next(self.find_all_possible_dnis(dni_str), not_found)
 
-    def find_all_possible_dnis(self, dni_str: str) -> Generator[Dni, None, None]:
+    def find_all_possible_dnis(
+        self, dni_str: str, shard_index: int = 0, shard_count: int = 1
+    ) -> Generator[Union[Dni, DniResult], None, None]:
         """Find the all of the valid dnis for the given dni_str
 
+        If structured, errors are yielded as a single DniResult
+
         Args:
             dni_str: The dni for which to find the missing numbers
 
@@ -58,10 +229,114 @@ class DniCalculatorProxy:
                     11_11?_?11_H
 
                 For further details, see DniParser
+            shard_index: The shard to find, from 0 to shard_count - 1
+            shard_count: The number of shards the valid dnis are split into.
+                See DniCalculator.find_all_possible_dnis
+        """
+        try:
+            dni = self._parse(dni_str)
+            dnis = self.dni_calc.find_all_possible_dnis(dni, shard_index, shard_count)
+            if not self.structured:
+                yield from dnis
+                return None
+            status = DniStatus.OK if dni.missing_digits else DniStatus.ALREADY_VALID
+            for res_dni in dnis:
+                yield DniResult(status, res_dni)
+        except DniException as e:
+            result = self._handle_exception(e)
+            if result is not None:
+                yield result
+
+    def find_all_possible_dni_blocks(
+        self,
+        dni_str: str,
+        block_size: int = DniCalculator.DEFAULT_BLOCK_SIZE,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> Generator[Union[bytes, DniResult], None, None]:
+        """Like find_all_possible_dnis, but yielding blocks of formatted dnis
+
+        Each block is a bytes buffer with up to block_size lines, as
+        returned by Dni.format_block, ready to be written at once.
+        If structured, errors and already valid dnis are yielded as a
+        single DniResult instead.
         """
         try:
-            dni = self.parser.parse_dni(dni_str)
-            yield from self.dni_calc.find_all_possible_dnis(dni)
+            dni = self._parse(dni_str)
+            blocks = self.dni_calc.find_all_possible_number_blocks(
+                dni, block_size, shard_index, shard_count
+            )
+            if self.structured and not dni.missing_digits:
+                for (number,) in blocks:
+                    yield DniResult(
+                        DniStatus.ALREADY_VALID, Dni(number, dni.letter, nie=dni.nie)
+                    )
+                return None
+            for block in blocks:
+                yield Dni.format_block(block, dni.letter, dni.nie)
         except DniException as e:
-            print(e)
-            return None
+            result = self._handle_exception(e)
+            if result is not None:
+                yield result
+
+    def find_registered_dnis(
+        self, dni_str: str
+    ) -> Generator[Union[Dni, DniResult], None, None]:
+        """Find the valid dnis for the given dni_str which are in the registry
+
+        See find_all_possible_dnis and DniCalculator.find_registered_dnis
+        """
+        try:
+            if self.registry is None:
+                raise DniException("No registry given to find registered dnis")
+            dni = self._parse(dni_str)
+            dnis = self.dni_calc.find_registered_dnis(dni, self.registry)
+            if not self.structured:
+                yield from dnis
+                return None
+            status = DniStatus.OK if dni.missing_digits else DniStatus.ALREADY_VALID
+            for res_dni in dnis:
+                yield DniResult(status, res_dni)
+        except DniException as e:
+            result = self._handle_exception(e)
+            if result is not None:
+                yield result
+
+    def top_k_possible_dnis(
+        self, dni_str: str, weights: Sequence[Optional[Sequence[float]]], k: int
+    ) -> Generator[Union[Dni, DniResult], None, None]:
+        """Find the k valid dnis for the given dni_str most likely by weights
+
+        Dnis are yielded from most to least likely. See
+        find_all_possible_dnis and DniCalculator.top_k_possible_dnis
+        """
+        try:
+            dni = self._parse(dni_str)
+            dnis = self.dni_calc.top_k_possible_dnis(dni, weights, k)
+            if not self.structured:
+                yield from dnis
+                return None
+            status = DniStatus.OK if dni.missing_digits else DniStatus.ALREADY_VALID
+            for res_dni in dnis:
+                yield DniResult(status, res_dni)
+        except DniException as e:
+            result = self._handle_exception(e)
+            if result is not None:
+                yield result
+
+    def _parse(self, dni_str: Union[str, int]) -> Dni:
+        """Parse dni_str as a NIE if nie, or as a dni otherwise
+
+        Raises:
+            DniParseException: if an invalid dni_str is given
+        """
+        if self.nie:
+            return self.parser.parse_nie(dni_str)
+        return self.parser.parse_dni(dni_str)
+
+    def _handle_exception(self, e: DniException) -> Optional[DniResult]:
+        """Return e as a DniResult if structured. Otherwise, print it"""
+        if self.structured:
+            return DniResult.from_exception(e)
+        print(e)
+        return None
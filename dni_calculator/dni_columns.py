@@ -0,0 +1,308 @@
+"""Vectorized helpers to validate and complete whole columns of dnis
+
+Columns can be pandas Series, pyarrow (chunked) arrays, numpy arrays or
+any sequence, containing either strings (dnis or NIEs, as accepted by
+DniParser, without "?") or integers. They are processed chunk by chunk with numpy,
+without creating a Dni for each row.
+
+Null or invalid rows never raise. Instead, they are masked in the
+returned columns: null in pandas and pyarrow, masked in numpy.
+
+Requires numpy to be installed. pandas and pyarrow are only needed to
+process their own columns.
+"""
+
+from typing import Any, Generator, NamedTuple, Optional, Tuple, Union
+
+from dni_calculator import Dni, DniException, DniParser
+from dni_calculator.dni_digits import LETTERS, MODULUS
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    numpy = None
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover - pandas is an optional dependency
+    pandas = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - pyarrow is an optional dependency
+    pyarrow = None
+
+
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+class DniColumns(NamedTuple):
+    """A column of dnis, split into numpy arrays
+
+    Attributes:
+        numbers: The number of each dni. 0 for invalid rows
+        letters: The letter of each dni, either given or calculated.
+            "" for invalid rows
+        valid: False for null or invalid rows
+        has_letter: True for the valid rows which included the letter
+    """
+
+    numbers: "numpy.ndarray"
+    letters: "numpy.ndarray"
+    valid: "numpy.ndarray"
+    has_letter: "numpy.ndarray"
+
+
+class NieColumns(NamedTuple):
+    """Like DniColumns, also telling which rows are NIEs
+
+    Attributes:
+        nie: True for the valid rows which are NIEs. Their prefix is the
+            first digit of their number (see Dni)
+    """
+
+    numbers: "numpy.ndarray"
+    letters: "numpy.ndarray"
+    valid: "numpy.ndarray"
+    has_letter: "numpy.ndarray"
+    nie: "numpy.ndarray"
+
+
+def parse_dni_column(
+    column: Any, chunk_size: int = DEFAULT_CHUNK_SIZE, nie: bool = False
+) -> Union[DniColumns, NieColumns]:
+    """Parse and validate a column of dnis, finding the missing letters
+
+    Rows can contain the letter or not. If they do, the letter has to be
+    the right one for the row to be valid.
+
+    Example:
+        ["11_111_111", "11111111-H", "11111111G", None, "X1234567"]
+            -> numbers=[11111111, 11111111, 0, 0, 1234567]
+               letters=["H", "H", "", "", "L"]
+               valid=[True, True, False, False, True]
+               has_letter=[False, True, False, False, False]
+               nie=[False, False, False, False, True] (only if nie)
+
+    Args:
+        column: A column of dnis. See module docstring
+        chunk_size: The number of rows processed at once
+        nie: Whether to return NieColumns instead of DniColumns. NIE
+            rows are valid either way, but otherwise they cannot be told
+            apart from the dnis with their prefix as first digit
+    """
+    _check_numpy()
+    parsed_chunks = [
+        _parse_chunk(values, nulls)
+        for values, nulls in _iter_chunks(column, chunk_size)
+    ]
+    if parsed_chunks:
+        columns = [numpy.concatenate(arrays) for arrays in zip(*parsed_chunks)]
+    else:
+        columns = [
+            numpy.zeros(0, dtype=numpy.int64),
+            numpy.zeros(0, dtype="U1"),
+            numpy.zeros(0, dtype=bool),
+            numpy.zeros(0, dtype=bool),
+            numpy.zeros(0, dtype=bool),
+        ]
+    return NieColumns(*columns) if nie else DniColumns(*columns[:-1])
+
+
+def find_letter_column(column: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Any:
+    """Return a column of the complete dnis, such as "11111111H"
+
+    Null or invalid rows are masked. See parse_dni_column
+
+    Args:
+        column: A column of dnis. See module docstring
+        chunk_size: The number of rows processed at once
+    """
+    numbers, letters, valid, _, nie = parse_dni_column(column, chunk_size, nie=True)
+    return _wrap_like(column, format_dni_column(numbers, letters, nie), valid)
+
+
+def validate_dni_column(column: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Any:
+    """Return a boolean column, True for the rows with a valid letter
+
+    Rows without letter, null or otherwise invalid are False
+
+    Args:
+        column: A column of dnis. See module docstring
+        chunk_size: The number of rows processed at once
+    """
+    _, _, valid, has_letter = parse_dni_column(column, chunk_size)
+    return _wrap_like(column, valid & has_letter, None)
+
+
+def format_dni_column(
+    numbers: "numpy.ndarray",
+    letters: "numpy.ndarray",
+    nie: Optional["numpy.ndarray"] = None,
+) -> "numpy.ndarray":
+    """Return the zero padded string of each number followed by its letter
+
+    Example:
+        numbers=[1_111_111, 11_111_111], letters=["H", "H"]
+            -> ["01111111H", "11111111H"]
+        numbers=[1_111_111, 11_111_111], letters=["H", "H"], nie=[True, True]
+            -> ["X1111111H", "Y1111111H"]
+
+    Args:
+        numbers: The number of each dni
+        letters: The letter of each dni
+        nie: Whether each dni is a NIE, written with its prefix. By
+            default, none is
+    """
+    _check_numpy()
+    powers = 10 ** numpy.arange(Dni.LENGTH_NUMS_ONLY - 1, -1, -1, dtype=numpy.int64)
+    codes = numpy.empty((len(numbers), Dni.LENGTH), dtype=numpy.uint32)
+    codes[:, :-1] = numbers[:, numpy.newaxis] // powers % 10 + ord("0")
+    codes[:, -1] = letters.astype("U1").view(numpy.uint32)
+    if nie is not None:
+        # NIE prefixes are consecutive letters, just like digits
+        codes[numpy.asarray(nie, dtype=bool), 0] += ord(Dni.NIE_PREFIXES[0]) - ord("0")
+    return codes.view(f"U{Dni.LENGTH}").ravel()
+
+
+def _check_numpy() -> None:
+    if numpy is None:
+        raise DniException("dni_columns requires numpy to be installed")
+
+
+def _iter_chunks(
+    column: Any, chunk_size: int
+) -> Generator[Tuple["numpy.ndarray", "numpy.ndarray"], None, None]:
+    """Yield the values of column in numpy chunks of up to chunk_size rows
+
+    Each chunk is yielded as (values, nulls). values are either integers
+    or strings, with nulls replaced by 0 or "".
+    """
+    if pyarrow is not None and isinstance(column, pyarrow.ChunkedArray):
+        for chunk in column.chunks:
+            yield from _iter_chunks(chunk, chunk_size)
+        return None
+
+    for start in range(0, len(column), chunk_size):
+        if pyarrow is not None and isinstance(column, pyarrow.Array):
+            chunk = column.slice(start, chunk_size)
+            nulls = chunk.is_null().to_numpy(zero_copy_only=False)
+            values = chunk.to_numpy(zero_copy_only=False)
+        elif pandas is not None and isinstance(column, pandas.Series):
+            chunk = column.iloc[start : start + chunk_size]
+            nulls = chunk.isna().to_numpy()
+            if pandas.api.types.is_integer_dtype(chunk.dtype):
+                values = chunk.fillna(0).to_numpy(dtype=numpy.int64)
+            elif pandas.api.types.is_float_dtype(chunk.dtype):
+                values = chunk.to_numpy(dtype=float, na_value=numpy.nan)
+            else:
+                values = chunk.to_numpy(dtype=object, na_value=None)
+        else:
+            values = numpy.asarray(column[start : start + chunk_size])
+            nulls = numpy.zeros(len(values), dtype=bool)
+
+        if values.dtype.kind == "f":
+            nulls = nulls | numpy.isnan(values)
+            values = numpy.where(nulls, 0, values)
+            # Numbers with decimals are not valid, so they are made too large
+            values = numpy.where(
+                values == numpy.floor(values), values, 10 ** Dni.LENGTH_NUMS_ONLY
+            ).astype(numpy.int64)
+        elif values.dtype.kind == "O":
+            nulls = nulls | _is_null(values)
+            values = numpy.where(nulls, "", values).astype(str)
+        yield values, nulls
+
+
+def _is_null(values: "numpy.ndarray") -> "numpy.ndarray":
+    """Return whether each of the object values is None or NaN"""
+    if pandas is not None:
+        return pandas.isna(values)
+    # NaN is the only value not equal to itself
+    return numpy.equal(values, None) | numpy.not_equal(values, values)
+
+
+def _parse_chunk(
+    values: "numpy.ndarray", nulls: "numpy.ndarray"
+) -> Tuple["numpy.ndarray", ...]:
+    """Parse a chunk as yielded by _iter_chunks
+
+    Returns the arrays of NieColumns for the chunk
+    """
+    if values.dtype.kind in "iu":
+        numbers = values.astype(numpy.int64)
+        valid = ~nulls & (numbers >= 0) & (numbers < 10 ** Dni.LENGTH_NUMS_ONLY)
+        numbers[~valid] = 0
+        letters = _get_letters(numbers)
+        letters[~valid] = ""
+        no_rows = numpy.zeros(len(numbers), dtype=bool)
+        return numbers, letters, valid, no_rows, no_rows.copy()
+
+    codes, lengths = _to_codes(values)
+    has_letter = lengths == Dni.LENGTH
+    valid = ~nulls & (has_letter | (lengths == Dni.LENGTH_NUMS_ONLY))
+
+    digits = codes[:, :-1].astype(numpy.int64) - ord("0")
+    nie_prefixes = codes[:, 0].astype(numpy.int64) - ord(Dni.NIE_PREFIXES[0])
+    nie = (nie_prefixes >= 0) & (nie_prefixes < len(Dni.NIE_PREFIXES))
+    digits[nie, 0] = nie_prefixes[nie]
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    digits[~valid] = 0
+    powers = 10 ** numpy.arange(Dni.LENGTH_NUMS_ONLY - 1, -1, -1, dtype=numpy.int64)
+    numbers = digits @ powers
+
+    letters = _get_letters(numbers)
+    given_letters = codes[:, -1].copy().view("U1")
+    valid &= ~has_letter | (given_letters == letters)
+    numbers[~valid] = 0
+    letters[~valid] = ""
+    return numbers, letters, valid, valid & has_letter, valid & nie
+
+
+def _to_codes(values: "numpy.ndarray") -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """Normalize strings and return their character codes and lengths
+
+    Characters in DniParser.IGNORED_CHARS are removed and the first
+    character and the letter are made upper case. Codes are returned as a (rows, Dni.LENGTH) array,
+    truncating longer strings. Their lengths are not truncated.
+    """
+    strings = values.astype(str)
+    for ignored_char in DniParser.IGNORED_CHARS:
+        strings = numpy.char.replace(strings, ignored_char, "")
+    lengths = numpy.char.str_len(strings)
+    codes = (
+        strings.astype(f"U{Dni.LENGTH}")
+        .view(numpy.uint32)
+        .reshape(len(strings), Dni.LENGTH)
+    )
+    for letter_codes in (codes[:, 0], codes[:, -1]):
+        is_lower = (letter_codes >= ord("a")) & (letter_codes <= ord("z"))
+        letter_codes[is_lower] -= ord("a") - ord("A")
+    return codes, lengths
+
+
+def _get_letters(numbers: "numpy.ndarray") -> "numpy.ndarray":
+    """Return the letter of each number"""
+    letters = numpy.array(list(LETTERS[:MODULUS]))
+    return letters[numbers % MODULUS]
+
+
+def _wrap_like(column: Any, values: "numpy.ndarray", valid: Any) -> Any:
+    """Return values as the same kind of column as column
+
+    Rows where valid is False are masked. If valid is None, no row is
+    """
+    if pandas is not None and isinstance(column, pandas.Series):
+        if valid is None:
+            return pandas.Series(values, index=column.index, name=column.name)
+        series = pandas.Series(
+            values, index=column.index, name=column.name, dtype="string"
+        )
+        return series.mask(~valid)
+    if pyarrow is not None and isinstance(
+        column, (pyarrow.Array, pyarrow.ChunkedArray)
+    ):
+        return pyarrow.array(values, mask=None if valid is None else ~valid)
+    if valid is None:
+        return values
+    return numpy.ma.MaskedArray(values, mask=~valid)
@@ -0,0 +1,248 @@
+"""Arithmetic on the digits of dni numbers
+
+The letter of a dni only depends on its number mod 23, so missing digits
+are solved by the residue their values add up to. These helpers are shared
+by DniCalculator, the engines in dni_engine and the rest of the modules
+which need them, without creating any Dni.
+"""
+
+from typing import Generator, Iterable, List, Optional, Sequence
+import itertools
+
+from dni_calculator import Dni, DniException
+
+LETTERS = "TRWAGMYFPDXBNJZSQVHLCKET"
+MODULUS = 23
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+
+def get_letter(number: int) -> str:
+    """Return the letter corresponding to the given dni number"""
+    return LETTERS[number % MODULUS]
+
+
+def get_letter_residue(letter: str) -> Optional[int]:
+    """Return the residue mod 23 a dni number needs to have the given letter
+
+    None is returned if no dni number can have such letter
+    """
+    residue = LETTERS.find(letter)
+    return residue if 0 <= residue < MODULUS else None
+
+
+def count_valid_numbers(dni: Dni) -> int:
+    """Count the valid numbers for dni from the completion counts
+
+    Args:
+        dni: A Dni with letter. If no digit is missing, 1 is returned
+            if dni is valid, 0 otherwise
+    """
+    residue = get_letter_residue(dni.letter)
+    if residue is None:
+        return 0
+    completion_counts = get_completion_counts(
+        get_place_values(dni.missing_digits), get_digits_values(dni)
+    )
+    return completion_counts[0][(residue - dni.number) % MODULUS]
+
+
+def get_digits_values(dni: Dni) -> List[range]:
+    """Return the values each of the missing digits of dni can have
+
+    All of them from 0 to 9, except for the prefix of a NIE, which is
+    one of Dni.NIE_PREFIXES
+    """
+    return [
+        range(len(Dni.NIE_PREFIXES)) if dni.nie and digit_pos == 0 else range(10)
+        for digit_pos in dni.missing_digits
+    ]
+
+
+def get_place_values(digits_pos: Iterable[int]) -> List[int]:
+    """Return the value a 1 at each of the digits_pos represents
+
+    Example:
+        digits_pos=(0, 5, 7) -> 10_000_000, 100, 1
+    """
+    return [10 ** (Dni.LENGTH_NUMS_ONLY - 1 - digit_pos) for digit_pos in digits_pos]
+
+
+def clear_digits(number: int, place_values: Sequence[int]) -> int:
+    """Return number with its digits at place_values set to 0
+
+    Example:
+        number=11_111_111, place_values=(100, 1) -> 11_111_010
+    """
+    return number - sum(number // value % 10 * value for value in place_values)
+
+
+def get_completion_counts(
+    place_values: Sequence[int],
+    digits_values: Optional[Sequence[Sequence[int]]] = None,
+) -> List[List[int]]:
+    """Count how many ways each residue can be reached by the digits
+
+    The returned table is such that table[i][r] is the number of
+    values digits i, i+1, ..., can have so that
+    sum(digit * place_value) % 23 == r
+
+    Args:
+        place_values: The value of each digit, as returned by
+            get_place_values
+        digits_values: The values each digit can have. By default,
+            all of them from 0 to 9
+    """
+    if digits_values is None:
+        digits_values = [range(10)] * len(place_values)
+    last_counts = [0] * MODULUS
+    last_counts[0] = 1
+    counts = [last_counts]
+    for place_value, digit_values in zip(
+        reversed(place_values), reversed(digits_values)
+    ):
+        place_residue = place_value % MODULUS
+        next_counts = [0] * MODULUS
+        for residue in range(MODULUS):
+            next_counts[residue] = sum(
+                last_counts[(residue - digit * place_residue) % MODULUS]
+                for digit in digit_values
+            )
+        counts.append(next_counts)
+        last_counts = next_counts
+    counts.reverse()
+    return counts
+
+
+def get_nth_completion(
+    place_values: Sequence[int],
+    completion_counts: Sequence[Sequence[int]],
+    needed_residue: int,
+    n: int,
+    digits_values: Optional[Sequence[Sequence[int]]] = None,
+) -> List[int]:
+    """Return the digits of the n-th (starting at 0) valid completion
+
+    Completions are sorted in increasing order, just like the values
+    returned by get_generator_for_digits
+
+    Args:
+        place_values: The value of each digit
+        completion_counts: As returned by get_completion_counts
+        needed_residue: The residue the digits have to add up to
+        n: Has to be lower than completion_counts[0][needed_residue]
+        digits_values: The values each digit can have, as given to
+            get_completion_counts
+    """
+    if digits_values is None:
+        digits_values = [range(10)] * len(place_values)
+    digits = []
+    for i, place_value in enumerate(place_values):
+        place_residue = place_value % MODULUS
+        for digit in digits_values[i]:
+            residue = (needed_residue - digit * place_residue) % MODULUS
+            count = completion_counts[i + 1][residue]
+            if n < count:
+                break
+            n -= count
+        digits.append(digit)
+        needed_residue = residue
+    return digits
+
+
+def get_generator_for_digits_from(
+    number: int,
+    place_values: Sequence[int],
+    start_digits: Sequence[int],
+    digits_values: Optional[Sequence[range]] = None,
+) -> Generator[int, None, None]:
+    """Return the numbers from the given digits onwards, in increasing order
+
+    Example:
+        number=1_000, place_values=(10, 1), start_digits=(9, 8)
+            -> 1_098, 1_099
+
+    Args:
+        number: The number whose digits at place_values are all 0
+        place_values: The value of each digit to iterate over
+        start_digits: The value each digit starts from
+        digits_values: The values each digit can have, from 0 up to
+            some maximum. By default, from 0 to 9
+    """
+    if digits_values is None:
+        max_digits = [9] * len(place_values)
+    else:
+        max_digits = [digit_values[-1] for digit_values in digits_values]
+    digits = list(start_digits)
+    number += sum(digit * value for digit, value in zip(digits, place_values))
+    last_digit = len(digits) - 1
+    while True:
+        yield number
+        i = last_digit
+        while i >= 0 and digits[i] == max_digits[i]:
+            number -= max_digits[i] * place_values[i]
+            digits[i] = 0
+            i -= 1
+        if i < 0:
+            return None
+        digits[i] += 1
+        number += place_values[i]
+
+
+def get_generator_for_digit(
+    digit_pos: int, digit_values: range = range(10)
+) -> Generator[int, None, None]:
+    """Return the different value the digit at position digit_pos can have
+
+    Examples:
+        digit_pos=7 -> 0, 1, 2, ..., 8, 9
+        digit_pos=6 -> 0, 10, 20, ..., 80, 90
+        digit_pos=0 -> 0, 10_000_000, ..., 90_000_000
+        digit_pos=0, digit_values=range(3) -> 0, 10_000_000, 20_000_000
+
+    Args:
+        digit_pos: A number from 0 to 9
+        digit_values: The values the digit can have
+    """
+    place_value = 10 ** (Dni.LENGTH_NUMS_ONLY - 1 - digit_pos)
+    for digit in digit_values:
+        yield digit * place_value
+
+
+def get_generator_for_digits(
+    digits_pos: Iterable[int],
+    digits_values: Optional[Iterable[range]] = None,
+) -> Generator[int, None, None]:
+    """Returns all combinations of values the digits at position digits_pos can have
+
+    Examples:
+        digit_pos=(7,) -> 0, 1, 2, ..., 8, 9
+        digit_pos=(6,) -> 0, 10, 20, ..., 80, 90
+        digit_pos=(0,) -> 0, 10_000_000, ..., 90_000_000
+        digit_pos=(6, 7) -> 0, 1, 2, ..., 98, 99
+        digit_pos=(5, 7) -> 0, 1, 2, ..., 9, 100, 101, ... 109, 200, ..., 908, 909
+        digit_pos=(0, 5) -> 0, 10_000_000, 10_000_100, 10_000_200, ..., 90_000_900
+
+    Args:
+        digits_pos: An iterable whose values have to be between 0 and 9
+            For the output to be in an expectable order, the iterable
+            has to return the numbers in increasing order.
+
+            For example, if digits_pos=(7, 6), the yielded values will be:
+            0, 10, 20, 30, ... 90, 1, 11, 21, ...
+        digits_values: The values each of the digits can have, as
+            returned by get_digits_values. By default, from 0 to 9
+    """
+    digits_pos = list(digits_pos)
+    if digits_values is None:
+        digits_values = [range(10)] * len(digits_pos)
+    digits_generators = [
+        get_generator_for_digit(digit_pos, digit_values)
+        for digit_pos, digit_values in zip(digits_pos, digits_values)
+    ]
+    digits_generator = itertools.product(*digits_generators)
+    yield from map(sum, digits_generator)
+
+
+class DniCalculationException(DniException):
+    """Exception calculating a Dni missing information"""
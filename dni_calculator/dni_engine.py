@@ -0,0 +1,646 @@
+"""Interchangeable strategies to find the missing numbers of a Dni
+
+Every engine finds the same numbers, in the same (increasing) order, for
+a Dni with a letter and at least one missing digit. Missing digits have
+to be sorted in increasing order, as DniParser returns them. NIEs are
+solved like dnis, only trying their possible prefixes.
+
+DniEnginePlanner chooses the engine expected to be the fastest for each
+dni, and AutoEngine uses it to pick an engine on every call.
+"""
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Generator, Iterable, List, Optional, Sequence
+import itertools
+import math
+import time
+
+from dni_calculator import Dni
+from dni_calculator.dni_digits import (
+    DEFAULT_BLOCK_SIZE,
+    MODULUS,
+    DniCalculationException,
+    count_valid_numbers,
+    get_completion_counts,
+    get_digits_values,
+    get_generator_for_digits,
+    get_letter_residue,
+    get_nth_completion,
+    get_place_values,
+)
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    numpy = None
+
+
+class DniEngine(ABC):
+    """Base class for the strategies used to find missing numbers
+
+    Subclasses have to implement find_all_numbers. The rest of the methods
+    are derived from it, and can be overridden to be faster
+    """
+
+    name = "engine"
+
+    @abstractmethod
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        """Find, in increasing order, every valid number for the given dni
+
+        Args:
+            dni: A Dni with letter and at least one missing digit
+        """
+
+    def find_first_number(self, dni: Dni) -> Optional[int]:
+        """Find the lowest valid number for the given dni, if any"""
+        return next(self.find_all_numbers(dni), None)
+
+    def count(self, dni: Dni) -> int:
+        """Count the valid numbers for the given dni"""
+        return sum(1 for _ in self.find_all_numbers(dni))
+
+    def find_number_blocks(
+        self, dni: Dni, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Generator[Sequence[int], None, None]:
+        """Find every valid number for the given dni, in blocks
+
+        Blocks are yielded in increasing order, and contain block_size
+        numbers in increasing order, except for the last one, which may
+        contain fewer.
+        """
+        numbers = self.find_all_numbers(dni)
+        while True:
+            block = list(itertools.islice(numbers, block_size))
+            if not block:
+                return None
+            yield block
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class BruteForceEngine(DniEngine):
+    """Check every possible number one by one
+
+    This is the reference every other engine is checked against
+    """
+
+    name = "brute_force"
+
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        for digits in get_generator_for_digits(
+            dni.missing_digits, get_digits_values(dni)
+        ):
+            number = dni.number + digits
+            if number % MODULUS == residue:
+                yield number
+
+
+class ArithmeticEngine(DniEngine):
+    """Only generate valid numbers, by grouping the last digits by residue
+
+    The values of the last missing digits (up to INNER_DIGITS of them) are
+    grouped by their residue mod 23. For each value of the remaining missing digits, the
+    values of the last ones completing a valid number are looked up
+    directly, so invalid numbers are never generated.
+    """
+
+    name = "arithmetic"
+
+    INNER_DIGITS = 4
+
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        split = self._get_split(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        inner_digits_by_residue = self._group_by_residue(
+            dni.missing_digits[split:], digits_values[split:]
+        )
+        for outer_digits in get_generator_for_digits(
+            dni.missing_digits[:split], digits_values[:split]
+        ):
+            number = dni.number + outer_digits
+            inner_digits = inner_digits_by_residue[(residue - number) % MODULUS]
+            yield from [number + digits for digits in inner_digits]
+
+    def find_number_blocks(
+        self, dni: Dni, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Generator[List[int], None, None]:
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        split = self._get_split(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        inner_digits_by_residue = self._group_by_residue(
+            dni.missing_digits[split:], digits_values[split:]
+        )
+        block: List[int] = []
+        for outer_digits in get_generator_for_digits(
+            dni.missing_digits[:split], digits_values[:split]
+        ):
+            number = dni.number + outer_digits
+            inner_digits = inner_digits_by_residue[(residue - number) % MODULUS]
+            block.extend(map(number.__add__, inner_digits))
+            offset = 0
+            while len(block) - offset >= block_size:
+                yield block[offset : offset + block_size]
+                offset += block_size
+            del block[:offset]
+        if block:
+            yield block
+
+    def find_first_number(self, dni: Dni) -> Optional[int]:
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        place_values = get_place_values(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        completion_counts = get_completion_counts(place_values, digits_values)
+        needed_residue = (residue - dni.number) % MODULUS
+        if completion_counts[0][needed_residue] == 0:
+            return None
+        digits = get_nth_completion(
+            place_values, completion_counts, needed_residue, 0, digits_values
+        )
+        return dni.number + sum(
+            digit * place_value for digit, place_value in zip(digits, place_values)
+        )
+
+    def count(self, dni: Dni) -> int:
+        return count_valid_numbers(dni)
+
+    def _get_split(self, digits_pos: Sequence[int]) -> int:
+        """Return how many of digits_pos are not grouped by residue
+
+        Grouping takes as long as iterating over the rest of the digits,
+        so about half of them are grouped, up to INNER_DIGITS
+        """
+        num_inner_digits = min((len(digits_pos) + 1) // 2, self.INNER_DIGITS)
+        return len(digits_pos) - num_inner_digits
+
+    def _group_by_residue(
+        self, digits_pos: Sequence[int], digits_values: Sequence[range]
+    ) -> List[List[int]]:
+        """Group the values of the digits at digits_pos by their residue mod 23
+
+        Each group is sorted in increasing order
+
+        Args:
+            digits_pos: The positions of the digits
+            digits_values: The values each of the digits can have
+        """
+        groups: List[List[int]] = [[] for _ in range(MODULUS)]
+        for digits in get_generator_for_digits(digits_pos, digits_values):
+            groups[digits % MODULUS].append(digits)
+        return groups
+
+
+class NumpyEngine(ArithmeticEngine):
+    """Like ArithmeticEngine, but solving blocks of numbers with NumPy
+
+    Requires numpy to be installed. See NumpyEngine.is_available
+    """
+
+    name = "numpy"
+
+    OUTER_BLOCK_SIZE = 1024
+
+    def __init__(self) -> None:
+        if not self.is_available():
+            raise DniCalculationException("NumpyEngine requires numpy to be installed")
+        super().__init__()
+
+    @staticmethod
+    def is_available() -> bool:
+        return numpy is not None
+
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        for block in self._find_number_blocks_of_any_size(dni):
+            yield from block.tolist()
+
+    def find_number_blocks(
+        self, dni: Dni, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Generator["numpy.ndarray", None, None]:
+        """Like DniEngine.find_number_blocks, but blocks are numpy arrays"""
+        block = numpy.zeros(0, dtype=numpy.int64)
+        for numbers in self._find_number_blocks_of_any_size(dni):
+            block = numpy.concatenate((block, numbers)) if block.size else numbers
+            while block.size >= block_size:
+                yield block[:block_size]
+                block = block[block_size:]
+        if block.size:
+            yield block
+
+    def _find_number_blocks_of_any_size(
+        self, dni: Dni
+    ) -> Generator["numpy.ndarray", None, None]:
+        """Find every valid number for the given dni, in blocks
+
+        Each block is an increasing numpy array of numbers, and blocks
+        are yielded in increasing order
+        """
+        residue = get_letter_residue(dni.letter)
+        if residue is None:
+            return None
+        split = self._get_split(dni.missing_digits)
+        digits_values = get_digits_values(dni)
+        groups = self._group_by_residue(
+            dni.missing_digits[split:], digits_values[split:]
+        )
+        group_sizes = numpy.array([len(group) for group in groups], dtype=numpy.int64)
+        group_starts = numpy.concatenate(([0], numpy.cumsum(group_sizes)[:-1]))
+        inner_digits = numpy.array(
+            list(itertools.chain.from_iterable(groups)), dtype=numpy.int64
+        )
+
+        outer_digits = get_generator_for_digits(
+            dni.missing_digits[:split], digits_values[:split]
+        )
+        while True:
+            numbers = numpy.fromiter(
+                itertools.islice(outer_digits, self.OUTER_BLOCK_SIZE),
+                dtype=numpy.int64,
+            )
+            if numbers.size == 0:
+                return None
+            numbers += dni.number
+            needed_residues = (residue - numbers) % MODULUS
+            sizes = group_sizes[needed_residues]
+            total = int(sizes.sum())
+            if total == 0:
+                continue
+            # Position of each result inside inner_digits: the start of
+            # its group plus its index within the results of its number
+            ends = numpy.cumsum(sizes)
+            indexes = numpy.arange(total, dtype=numpy.int64)
+            indexes += numpy.repeat(
+                group_starts[needed_residues] - (ends - sizes), sizes
+            )
+            yield numpy.repeat(numbers, sizes) + inner_digits[indexes]
+
+
+def _find_numbers_with_first_digit(dni: Dni, digit: int) -> List[int]:
+    """Find the numbers of dni whose first missing digit is the given one
+
+    Run in ProcessPoolEngine workers
+    """
+    sub_dni = dni.copy()
+    first_missing_digit = sub_dni.missing_digits.pop(0)
+    sub_dni.number += digit * 10 ** (Dni.LENGTH_NUMS_ONLY - 1 - first_missing_digit)
+    if not sub_dni.missing_digits:
+        residue = get_letter_residue(dni.letter)
+        return [sub_dni.number] if sub_dni.number % MODULUS == residue else []
+    return list(ArithmeticEngine().find_all_numbers(sub_dni))
+
+
+class ProcessPoolEngine(DniEngine):
+    """Split the numbers by their first missing digit, and find them in
+    several processes using ArithmeticEngine
+    """
+
+    name = "process_pool"
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """
+        Args:
+            max_workers: The number of processes to use. By default,
+                as many as processors in the machine
+        """
+        super().__init__()
+        self.max_workers = max_workers
+
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        for numbers in self._find_parts(dni):
+            yield from numbers
+
+    def find_number_blocks(
+        self, dni: Dni, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Generator[List[int], None, None]:
+        block: List[int] = []
+        for numbers in self._find_parts(dni):
+            block.extend(numbers)
+            offset = 0
+            while len(block) - offset >= block_size:
+                yield block[offset : offset + block_size]
+                offset += block_size
+            del block[:offset]
+        if block:
+            yield block
+
+    def find_first_number(self, dni: Dni) -> Optional[int]:
+        return ArithmeticEngine().find_first_number(dni)
+
+    def count(self, dni: Dni) -> int:
+        return ArithmeticEngine().count(dni)
+
+    def _find_parts(self, dni: Dni) -> Generator[List[int], None, None]:
+        """Yield, in increasing order, the numbers for each first digit"""
+        with ProcessPoolExecutor(self.max_workers) as executor:
+            parts = [
+                executor.submit(_find_numbers_with_first_digit, dni, digit)
+                for digit in get_digits_values(dni)[0]
+            ]
+            for part in parts:
+                yield part.result()
+
+    def __repr__(self) -> str:
+        return f"ProcessPoolEngine(max_workers={self.max_workers})"
+
+
+class DniEnginePlanner:
+    """Choose the fastest engine for a dni and the requested output
+
+    The choice is made from the number of candidates (10 ** number of
+    missing digits, or fewer for NIEs missing their prefix) compared
+    against thresholds, which can be measured in the current machine
+    with calibrate. A threshold set to None disables its engine.
+    """
+
+    FIRST = "first"
+    COUNT = "count"
+    ALL = "all"
+    BLOCKS = "blocks"
+
+    def __init__(
+        self,
+        arithmetic_threshold: Optional[int] = 10 ** 2,
+        numpy_threshold: Optional[int] = None,
+        numpy_blocks_threshold: Optional[int] = 10 ** 5,
+        process_pool_threshold: Optional[int] = 10 ** 8,
+    ) -> None:
+        """
+        Args:
+            arithmetic_threshold: Minimum number of candidates to use
+                ArithmeticEngine instead of BruteForceEngine
+            numpy_threshold: Minimum number of candidates to use
+                NumpyEngine to find all numbers. Disabled by default, as
+                converting its arrays back to ints takes as long as
+                ArithmeticEngine
+            numpy_blocks_threshold: Minimum number of candidates to use
+                NumpyEngine to find number blocks
+            process_pool_threshold: Minimum number of candidates to use
+                ProcessPoolEngine to find all numbers
+        """
+        self.arithmetic_threshold = arithmetic_threshold
+        self.numpy_threshold = numpy_threshold
+        self.numpy_blocks_threshold = numpy_blocks_threshold
+        self.process_pool_threshold = process_pool_threshold
+        self._engines: Dict[str, DniEngine] = {
+            engine.name: engine
+            for engine in (BruteForceEngine(), ArithmeticEngine(), ProcessPoolEngine())
+        }
+        if NumpyEngine.is_available():
+            self._engines[NumpyEngine.name] = NumpyEngine()
+
+    def choose(self, dni: Dni, output: str = ALL) -> DniEngine:
+        """Return the engine to find the given output for dni
+
+        Args:
+            dni: A Dni with letter and at least one missing digit
+            output: One of FIRST, COUNT, ALL or BLOCKS
+        """
+        if output not in (self.FIRST, self.COUNT, self.ALL, self.BLOCKS):
+            raise DniCalculationException(f'Unknown output: "{output}"')
+        candidates = math.prod(map(len, get_digits_values(dni)))
+        if not _reaches(candidates, self.arithmetic_threshold):
+            return self._engines[BruteForceEngine.name]
+        if output in (self.FIRST, self.COUNT):
+            return self._engines[ArithmeticEngine.name]
+        if output == self.ALL and _reaches(candidates, self.process_pool_threshold):
+            return self._engines[ProcessPoolEngine.name]
+        # NumpyEngine solves the last digits of a block of numbers at
+        # once, so it is not worth it unless there are more missing digits
+        numpy_threshold = (
+            self.numpy_threshold if output == self.ALL else self.numpy_blocks_threshold
+        )
+        if (
+            _reaches(candidates, numpy_threshold)
+            and len(dni.missing_digits) > ArithmeticEngine.INNER_DIGITS
+            and NumpyEngine.name in self._engines
+        ):
+            return self._engines[NumpyEngine.name]
+        return self._engines[ArithmeticEngine.name]
+
+    def calibrate(self, max_missing_digits: int = 7, repeat: int = 3) -> None:
+        """Set the thresholds from a microbenchmark run in this machine
+
+        Each engine is only measured on the dnis choose can route to it,
+        up to max_missing_digits missing digits, running the operation it
+        would be delegated, against the engine chosen without it:
+
+        - ArithmeticEngine finding all numbers from 1 missing digit,
+          until it is faster than BruteForceEngine, which only gets
+          slower in comparison
+        - NumpyEngine finding all numbers, and number blocks, from
+          ArithmeticEngine.INNER_DIGITS + 1 missing digits
+        - ProcessPoolEngine finding all numbers from 7 missing digits, as
+          otherwise the cost of starting processes dominates
+
+        Each threshold is set to the lowest number of candidates from
+        which its engine is faster on every measured dni, or to None,
+        disabling the engine, if it is not faster with the most missing
+        digits. Thresholds of engines which are not measured are kept.
+        """
+        self._calibrate_threshold(
+            "arithmetic_threshold",
+            ArithmeticEngine.name,
+            self.ALL,
+            range(1, max_missing_digits + 1),
+            repeat,
+            until_faster=True,
+        )
+        numpy_missing_digits = range(
+            ArithmeticEngine.INNER_DIGITS + 1, max_missing_digits + 1
+        )
+        if NumpyEngine.name in self._engines and numpy_missing_digits:
+            for threshold, output in (
+                ("numpy_threshold", self.ALL),
+                ("numpy_blocks_threshold", self.BLOCKS),
+            ):
+                self._calibrate_threshold(
+                    threshold, NumpyEngine.name, output, numpy_missing_digits, repeat
+                )
+        if max_missing_digits >= 7:
+            self._calibrate_threshold(
+                "process_pool_threshold",
+                ProcessPoolEngine.name,
+                self.ALL,
+                range(7, max_missing_digits + 1),
+                repeat,
+            )
+
+    def _calibrate_threshold(
+        self,
+        threshold: str,
+        engine_name: str,
+        output: str,
+        missing_digits_range: range,
+        repeat: int,
+        until_faster: bool = False,
+    ) -> None:
+        """Set threshold from timing its engine against the chosen without it
+
+        Args:
+            threshold: The name of the threshold attribute
+            engine_name: The name of the engine it enables
+            output: The output the engine is timed on, ALL or BLOCKS
+            missing_digits_range: The numbers of missing digits to measure
+            repeat: How many times each engine is timed, keeping the best
+            until_faster: Stop measuring once the engine is faster
+        """
+        engine = self._engines[engine_name]
+        setattr(self, threshold, None)
+        lowest = None
+        for num_missing_digits in missing_digits_range:
+            dni = _get_benchmark_dni(num_missing_digits)
+            other = self.choose(dni, output)
+            if _time_engine(engine, dni, output, repeat) < _time_engine(
+                other, dni, output, repeat
+            ):
+                lowest = lowest or 10 ** num_missing_digits
+                if until_faster:
+                    break
+            else:
+                lowest = None
+        setattr(self, threshold, lowest)
+
+
+def _reaches(candidates: int, threshold: Optional[int]) -> bool:
+    """Return whether candidates reaches threshold, unless it is disabled"""
+    return threshold is not None and candidates >= threshold
+
+
+def _get_benchmark_dni(num_missing_digits: int) -> Dni:
+    """Return a dni whose last num_missing_digits digits are missing"""
+    missing_digits = list(
+        range(Dni.LENGTH_NUMS_ONLY - num_missing_digits, Dni.LENGTH_NUMS_ONLY)
+    )
+    return Dni(
+        12_345_678 // 10 ** num_missing_digits * 10 ** num_missing_digits,
+        "Z",
+        missing_digits,
+    )
+
+
+def _time_engine(engine: DniEngine, dni: Dni, output: str, repeat: int) -> float:
+    """Return the best time, in seconds, engine takes to find the output
+
+    Args:
+        output: DniEnginePlanner.ALL to find all numbers, or
+            DniEnginePlanner.BLOCKS to find number blocks
+    """
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if output == DniEnginePlanner.BLOCKS:
+            results = engine.find_number_blocks(dni)
+        else:
+            results = engine.find_all_numbers(dni)
+        for _ in results:
+            pass
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+class AutoEngine(DniEngine):
+    """Use the engine chosen by a DniEnginePlanner on each call"""
+
+    name = "auto"
+
+    def __init__(self, planner: Optional[DniEnginePlanner] = None) -> None:
+        super().__init__()
+        self.planner = planner if planner is not None else DniEnginePlanner()
+
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        return self.planner.choose(dni, DniEnginePlanner.ALL).find_all_numbers(dni)
+
+    def find_first_number(self, dni: Dni) -> Optional[int]:
+        return self.planner.choose(dni, DniEnginePlanner.FIRST).find_first_number(dni)
+
+    def count(self, dni: Dni) -> int:
+        return self.planner.choose(dni, DniEnginePlanner.COUNT).count(dni)
+
+    def find_number_blocks(
+        self, dni: Dni, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Generator[Sequence[int], None, None]:
+        engine = self.planner.choose(dni, DniEnginePlanner.BLOCKS)
+        return engine.find_number_blocks(dni, block_size)
+
+
+class DifferentialEngine(DniEngine):
+    """Check every engine returns the same as BruteForceEngine
+
+    Meant for testing. Every call is run by the reference engine and by
+    each of the engines, raising DniCalculationException on any mismatch
+    """
+
+    name = "differential"
+
+    def __init__(self, engines: Iterable[DniEngine]) -> None:
+        super().__init__()
+        self.reference = BruteForceEngine()
+        self.engines = list(engines)
+
+    def find_all_numbers(self, dni: Dni) -> Generator[int, None, None]:
+        expected = list(self.reference.find_all_numbers(dni))
+        for engine in self.engines:
+            self._check(
+                engine,
+                dni,
+                "find_all_numbers",
+                list(engine.find_all_numbers(dni)),
+                expected,
+            )
+        yield from expected
+
+    def find_first_number(self, dni: Dni) -> Optional[int]:
+        expected = self.reference.find_first_number(dni)
+        for engine in self.engines:
+            self._check(
+                engine,
+                dni,
+                "find_first_number",
+                engine.find_first_number(dni),
+                expected,
+            )
+        return expected
+
+    def count(self, dni: Dni) -> int:
+        expected = self.reference.count(dni)
+        for engine in self.engines:
+            self._check(engine, dni, "count", engine.count(dni), expected)
+        return expected
+
+    def find_number_blocks(
+        self, dni: Dni, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Generator[List[int], None, None]:
+        expected = [
+            list(block) for block in self.reference.find_number_blocks(dni, block_size)
+        ]
+        for engine in self.engines:
+            # Compared as lists, so that the size of every block is checked
+            # too, whichever sequence the engine returns
+            self._check(
+                engine,
+                dni,
+                "find_number_blocks",
+                [list(block) for block in engine.find_number_blocks(dni, block_size)],
+                expected,
+            )
+        yield from expected
+
+    def _check(
+        self, engine: DniEngine, dni: Dni, method: str, result, expected
+    ) -> None:
+        """Raise DniCalculationException if result is not the expected one"""
+        if result != expected:
+            raise DniCalculationException(
+                f'{engine!r}.{method} differs from the reference for "{dni}"'
+            )
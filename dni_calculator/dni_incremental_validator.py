@@ -0,0 +1,203 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+from dni_calculator import Dni, DniParser, DniParseException
+from dni_calculator.dni_digits import (
+    LETTERS,
+    MODULUS,
+    get_completion_counts,
+    get_letter_residue,
+    get_place_values,
+)
+
+
+class _InputState(NamedTuple):
+    """What is known about the input after each of its characters
+
+    Attributes:
+        num_digits: The number of digits typed, known or not
+        num_missing_digits: The number of digits typed as "?"
+        residue: The sum of the known digits times their place value, mod 23
+        unknown_counts: unknown_counts[r] is the number of values the
+            unknown digits can have so that their sum, times their place
+            values, is r mod 23
+        letter: The letter typed, "?" if unknown, or None if not typed yet
+        nie: Whether the input is a NIE
+    """
+
+    num_digits: int
+    num_missing_digits: int
+    residue: int
+    unknown_counts: Tuple[int, ...]
+    letter: Optional[str]
+    nie: bool
+
+
+class DniIncrementalValidator:
+    """Check a dni as it is typed, one character at a time
+
+    Characters are appended and deleted like in a text input. Every
+    keystroke takes constant time, regardless of the length of the input:
+    the state after each character is kept in a stack, so neither the input
+    is parsed again nor the valid dnis are enumerated.
+
+    Allowed input is the same as DniParser.parse_dni, or DniParser.parse_nie
+    if nie is True.
+
+    Example:
+        validator = DniIncrementalValidator("11_111_11")
+        validator.count_completions() -> 10
+        validator.append("1")
+        validator.letter -> "H"
+        validator.append("G")
+        validator.is_completable -> False
+        validator.delete()
+        validator.append("H")
+        validator.is_valid -> True
+    """
+
+    _PLACE_RESIDUES = [
+        place_value % MODULUS
+        for place_value in get_place_values(range(Dni.LENGTH_NUMS_ONLY))
+    ]
+    _PREFIX_VALUES = range(len(Dni.NIE_PREFIXES))
+    # _FREE_COUNTS[i][r] is the number of values digits i, i+1, ... can
+    # have so that their sum, times their place values, is r mod 23
+    _FREE_COUNTS = get_completion_counts(_PLACE_RESIDUES)
+    _NIE_FREE_COUNTS = get_completion_counts(
+        _PLACE_RESIDUES, [_PREFIX_VALUES] + [range(10)] * (Dni.LENGTH_NUMS_ONLY - 1)
+    )
+
+    def __init__(self, dni_str: str = "", nie: bool = False) -> None:
+        """
+        Args:
+            dni_str: The initial input. See append
+            nie: Whether the input has to be a NIE, so that its first
+                character is a prefix or "?" for any of them. Otherwise,
+                NIEs are only recognized once their prefix is typed
+
+        Raises:
+            DniParseException: if dni_str cannot be the start of a dni
+        """
+        no_unknowns = (1,) + (0,) * (MODULUS - 1)
+        self._nie = nie
+        self._chars: List[str] = []
+        self._states = [_InputState(0, 0, 0, no_unknowns, None, nie)]
+        self.append(dni_str)
+
+    @property
+    def text(self) -> str:
+        """The input so far"""
+        return "".join(self._chars)
+
+    @property
+    def nie(self) -> bool:
+        """Whether the input is a NIE"""
+        return self._states[-1].nie
+
+    @property
+    def letter(self) -> Optional[str]:
+        """The letter implied by the digits, once all of them are known"""
+        state = self._states[-1]
+        if state.num_digits < Dni.LENGTH_NUMS_ONLY or state.num_missing_digits:
+            return None
+        return LETTERS[state.residue]
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether the input is a complete and valid dni"""
+        state = self._states[-1]
+        return state.letter is not None and state.letter == self.letter
+
+    @property
+    def is_completable(self) -> bool:
+        """Whether the input can still become a valid dni"""
+        return self.count_completions() > 0
+
+    def count_completions(self) -> int:
+        """Return the number of valid dnis the input can become
+
+        Digits not typed yet count as unknown, and so does the letter, if
+        not typed yet or typed as "?"
+        """
+        state = self._states[-1]
+        free_counts = (self._NIE_FREE_COUNTS if self._nie else self._FREE_COUNTS)[
+            state.num_digits
+        ]
+        if state.letter is None or state.letter == DniParser.UNKNOWN_DIGIT:
+            # Every number has a single letter
+            return sum(state.unknown_counts) * sum(free_counts)
+        letter_residue = get_letter_residue(state.letter)
+        if letter_residue is None:
+            return 0
+        needed_residue = letter_residue - state.residue
+        return sum(
+            count * free_counts[(needed_residue - residue) % MODULUS]
+            for residue, count in enumerate(state.unknown_counts)
+            if count
+        )
+
+    def append(self, chars: str) -> None:
+        """Type chars at the end of the input
+
+        Raises:
+            DniParseException: if a character cannot follow the input. The
+                characters before it are kept
+        """
+        for char in chars:
+            self._states.append(self._get_next_state(char))
+            self._chars.append(char)
+
+    def delete(self, count: int = 1) -> None:
+        """Delete the last count characters of the input, or all of them"""
+        for _ in range(min(count, len(self._chars))):
+            self._chars.pop()
+            self._states.pop()
+
+    def _get_next_state(self, char: str) -> _InputState:
+        """Return the state after typing char
+
+        Raises:
+            DniParseException: if char cannot follow the input
+        """
+        state = self._states[-1]
+        if char in DniParser.IGNORED_CHARS:
+            return state
+        if state.letter is not None:
+            raise DniParseException(self.text + char, "Nothing can follow the letter")
+        if state.num_digits == Dni.LENGTH_NUMS_ONLY:
+            if char != DniParser.UNKNOWN_DIGIT and not char.isalpha():
+                raise DniParseException(self.text + char, f'Invalid letter: "{char}"')
+            return state._replace(letter=char.upper())
+
+        place_residue = self._PLACE_RESIDUES[state.num_digits]
+        is_prefix = state.num_digits == 0
+        if is_prefix and char.upper() in Dni.NIE_PREFIXES:
+            return state._replace(
+                num_digits=1,
+                residue=Dni.NIE_PREFIXES.index(char.upper()) * place_residue % MODULUS,
+                nie=True,
+            )
+        if is_prefix and self._nie and char != DniParser.UNKNOWN_DIGIT:
+            raise DniParseException(self.text + char, f'Invalid NIE prefix: "{char}"')
+
+        if char == DniParser.UNKNOWN_DIGIT:
+            counts = state.unknown_counts
+            digit_values = self._PREFIX_VALUES if is_prefix and self._nie else range(10)
+            unknown_counts = tuple(
+                sum(
+                    counts[(residue - digit * place_residue) % MODULUS]
+                    for digit in digit_values
+                )
+                for residue in range(MODULUS)
+            )
+            return state._replace(
+                num_digits=state.num_digits + 1,
+                num_missing_digits=state.num_missing_digits + 1,
+                unknown_counts=unknown_counts,
+            )
+        if not ("0" <= char <= "9"):
+            raise DniParseException(self.text + char, f'Invalid number: "{char}"')
+        return state._replace(
+            num_digits=state.num_digits + 1,
+            residue=(state.residue + int(char) * place_residue) % MODULUS,
+        )
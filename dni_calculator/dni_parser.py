@@ -16,7 +16,7 @@ class DniParser:
         Raises:
             DniParseException: if an invalid dni_str is given
         """
-        dni_str = self._pre_parse(dni_str)
+        dni_str = self.pre_parse(dni_str)
         if not dni_str:
             raise DniParseException(dni_str, "Is empty")
 
@@ -40,10 +40,13 @@ class DniParser:
                 11-111-?11-H
                 11-111-?11-?
 
+                NIEs are also valid, starting with their prefix:
+                X-1111?11-H
+
         Raises:
             DniParseException: if an invalid dni_str is given
         """
-        dni_str = self._pre_parse(dni_str)
+        dni_str = self.pre_parse(dni_str)
         if not dni_str:
             raise DniParseException(dni_str, "Is empty")
 
@@ -54,7 +57,47 @@ class DniParser:
 
         return self._parse(dni_str)
 
-    def _pre_parse(self, dni_str: Union[str, int, float, complex]) -> str:
+    def parse_nie_without_letter(self, dni_str: Union[str, int, float, complex]) -> Dni:
+        """Transform a string representation of a NIE (without letter) to a Dni
+
+        See parse_nie for allowed input
+
+        Raises:
+            DniParseException: if an invalid dni_str is given
+        """
+        dni_str = self.pre_parse(dni_str)
+        if not dni_str:
+            raise DniParseException(dni_str, "Is empty")
+
+        if len(dni_str) != Dni.LENGTH_NUMS_ONLY:
+            raise DniParseException(
+                dni_str, f"Should contain {Dni.LENGTH_NUMS_ONLY} numbers"
+            )
+
+        return self._parse(dni_str + self.UNKNOWN_DIGIT, nie=True)
+
+    def parse_nie(self, dni_str: Union[str, int, float, complex]) -> Dni:
+        """Tranform a string representation of a NIE to a Dni
+
+        Like parse_dni, but the first character has to be a NIE prefix
+        (see Dni.NIE_PREFIXES), or UNKNOWN_DIGIT if it is not known:
+            ?-1111?11-H
+
+        Raises:
+            DniParseException: if an invalid dni_str is given
+        """
+        dni_str = self.pre_parse(dni_str)
+        if not dni_str:
+            raise DniParseException(dni_str, "Is empty")
+
+        if len(dni_str) != Dni.LENGTH:
+            raise DniParseException(
+                dni_str, f"Should be {Dni.LENGTH} characters long, including the letter"
+            )
+
+        return self._parse(dni_str, nie=True)
+
+    def pre_parse(self, dni_str: Union[str, int, float, complex]) -> str:
         """Removes IGNORED_CHARS from dni_str and cast to str if needed
 
         Raises:
@@ -71,25 +114,36 @@ class DniParser:
 
         return dni_str
 
-    def _parse(self, dni_str: str) -> Dni:
+    def _parse(self, dni_str: str, nie: bool = False) -> Dni:
         """Does the actual parsing as described in parse_dni
 
         Args:
             dni_str: An str exactly Dni.LENGTH characters long not
                 containing any of IGNORED_CHARS
+            nie: Whether dni_str has to be a NIE, as described in parse_nie
 
         Raises:
             DniParseException: if an invalid dni_str is given
         """
         dni = Dni()
 
+        dni_number_str = dni_str[:-1]
+        prefix = dni_number_str[0].upper()
+        if prefix in Dni.NIE_PREFIXES:
+            dni.nie = True
+            prefix_digit = str(Dni.NIE_PREFIXES.index(prefix))
+            dni_number_str = prefix_digit + dni_number_str[1:]
+        elif nie and prefix != self.UNKNOWN_DIGIT:
+            raise DniParseException(dni_str, f'Invalid NIE prefix: "{prefix}"')
+        else:
+            dni.nie = nie
+
         dni.letter = dni_str[-1].upper()
         if dni.letter == self.UNKNOWN_DIGIT:
             dni.letter = None
         elif not dni.letter.isalpha():
             raise DniParseException(dni_str, f'Invalid letter: "{dni.letter}"')
 
-        dni_number_str = dni_str[:-1]
         missing_digits : List[int] = list()
         for i, digit in enumerate(dni_number_str):
             if digit == self.UNKNOWN_DIGIT:
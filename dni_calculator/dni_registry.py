@@ -0,0 +1,206 @@
+from array import array
+from bisect import bisect_left
+from typing import BinaryIO, Generator, Iterable, Tuple, Union
+import mmap
+import re
+import sys
+
+from dni_calculator import Dni, DniException, DniParser
+
+
+class DniRegistry:
+    """A sorted set of known dni numbers, memory-mapped from a file
+
+    The file is built once with DniRegistry.build and contains the numbers
+    (without letter) as sorted and unique little-endian uint32. Opening it
+    does not read it: pages are loaded by the OS as lookups touch them.
+
+    Example:
+        DniRegistry.build(["11111111H", "22222222J"], "registry.bin")
+        with DniRegistry("registry.bin") as registry:
+            11_111_111 in registry -> True
+    """
+
+    TYPECODE = "I" if array("I").itemsize == 4 else "L"
+    ITEMSIZE = 4
+
+    _WRITE_BUFFER_SIZE = 1 << 16
+
+    def __init__(self, path: str) -> None:
+        """Open a registry previously built with DniRegistry.build
+
+        Raises:
+            DniRegistryException: if path is not a valid registry
+        """
+        self.path = path
+        self._mmap = None
+        with open(path, "rb") as registry_file:
+            size = registry_file.seek(0, 2)
+            if size % self.ITEMSIZE != 0:
+                raise DniRegistryException(
+                    f'Invalid registry "{path}". Its size is not a multiple of '
+                    f"{self.ITEMSIZE}"
+                )
+            if size == 0:
+                self._numbers = memoryview(b"").cast(self.TYPECODE)
+            elif sys.byteorder == "little":
+                self._mmap = mmap.mmap(
+                    registry_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+                self._numbers = memoryview(self._mmap).cast(self.TYPECODE)
+            else:
+                numbers = array(self.TYPECODE)
+                registry_file.seek(0)
+                numbers.fromfile(registry_file, size // self.ITEMSIZE)
+                numbers.byteswap()
+                self._numbers = memoryview(numbers)
+
+    @classmethod
+    def build(cls, dnis: Iterable[Union[str, int]], path: str) -> "DniRegistry":
+        """Build a registry file from the given dnis and open it
+
+        Args:
+            dnis: The dnis, with or without letter (see DniParser), or
+                their numbers. Duplicates are allowed
+            path: Where to write the registry. Overwritten if it exists
+
+        Raises:
+            DniException: if any of dnis is not valid, has missing
+                digits or is a NIE
+        """
+        # Numbers are sorted and deduplicated by setting their bit in a
+        # bitmap, which takes 12.5MB regardless of the number of dnis
+        bitmap = bytearray(10 ** Dni.LENGTH_NUMS_ONLY // 8)
+        parser = DniParser()
+        for dni in dnis:
+            number = cls._parse_number(parser, dni)
+            bitmap[number >> 3] |= 1 << (number & 7)
+
+        bits_by_byte = [
+            [bit for bit in range(8) if byte >> bit & 1] for byte in range(256)
+        ]
+        with open(path, "wb") as registry_file:
+            numbers = array(cls.TYPECODE)
+            for match in re.finditer(b"[^\\x00]", bitmap):
+                byte_index = match.start()
+                first_number = byte_index << 3
+                numbers.extend(
+                    first_number + bit for bit in bits_by_byte[bitmap[byte_index]]
+                )
+                if len(numbers) >= cls._WRITE_BUFFER_SIZE:
+                    cls._write_numbers(numbers, registry_file)
+                    numbers = array(cls.TYPECODE)
+            cls._write_numbers(numbers, registry_file)
+        return cls(path)
+
+    @staticmethod
+    def _write_numbers(numbers: array, registry_file: BinaryIO) -> None:
+        """Write numbers to registry_file as little-endian uint32"""
+        if sys.byteorder != "little":
+            numbers.byteswap()
+        numbers.tofile(registry_file)
+
+    @classmethod
+    def build_from_file(cls, dnis_path: str, path: str) -> "DniRegistry":
+        """Build a registry file from a text file with a dni per line
+
+        Empty lines are ignored. See build
+        """
+        with open(dnis_path) as dnis_file:
+            return cls.build((line.strip() for line in dnis_file if line.strip()), path)
+
+    @staticmethod
+    def _parse_number(parser: DniParser, dni: Union[str, int]) -> int:
+        """Return the number of the given dni, with or without letter
+
+        Raises:
+            DniException: if dni is not valid, has missing digits or is
+                a NIE
+        """
+        if type(dni) is int and 0 <= dni < 10 ** Dni.LENGTH_NUMS_ONLY:
+            return dni
+        dni_str = parser.pre_parse(dni)
+        if len(dni_str) == Dni.LENGTH_NUMS_ONLY:
+            parsed_dni = parser.parse_dni_without_letter(dni_str)
+        else:
+            parsed_dni = parser.parse_dni(dni_str)
+        if parsed_dni.missing_digits:
+            raise DniRegistryException(
+                f'Invalid dni: "{dni}". Registry dnis cannot have missing digits'
+            )
+        if parsed_dni.nie:
+            raise DniRegistryException(
+                f'Invalid dni: "{dni}". Registries cannot hold NIEs'
+            )
+        return parsed_dni.number
+
+    def close(self) -> None:
+        self._numbers.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> "DniRegistry":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, number: int) -> bool:
+        i = bisect_left(self._numbers, number)
+        return i < len(self._numbers) and self._numbers[i] == number
+
+    def get_range_bounds(self, lower: int, upper: int) -> Tuple[int, int]:
+        """Return the [start, end) indexes of the numbers in [lower, upper]"""
+        start = bisect_left(self._numbers, lower)
+        end = bisect_left(self._numbers, upper + 1, start)
+        return start, end
+
+    def find_in_range(self, lower: int, upper: int) -> Generator[int, None, None]:
+        """Yield, in increasing order, the numbers in [lower, upper]"""
+        start, end = self.get_range_bounds(lower, upper)
+        # Yielded by index, as a slice would keep the mmap exported, and
+        # so impossible to close, while the generator is not exhausted
+        registry_numbers = self._numbers
+        for i in range(start, end):
+            yield registry_numbers[i]
+
+    def intersect(self, numbers: Iterable[int]) -> Generator[int, None, None]:
+        """Yield the numbers which are in the registry
+
+        Each number is looked for by galloping from the previous one, so
+        that close numbers take few comparisons and far away ones only a
+        logarithmic amount of them.
+
+        Args:
+            numbers: Numbers sorted in increasing order
+        """
+        registry_numbers = self._numbers
+        end = len(registry_numbers)
+        i = 0
+        for number in numbers:
+            i = self._gallop(number, i, end)
+            if i == end:
+                return None
+            if registry_numbers[i] == number:
+                yield number
+
+    def _gallop(self, number: int, start: int, end: int) -> int:
+        """Return the first index in [start, end) whose number is >= number
+
+        end is returned if there is no such index
+        """
+        registry_numbers = self._numbers
+        if start >= end or registry_numbers[start] >= number:
+            return start
+        step = 1
+        while start + step < end and registry_numbers[start + step] < number:
+            start += step
+            step *= 2
+        return bisect_left(registry_numbers, number, start + 1, min(start + step, end))
+
+
+class DniRegistryException(DniException):
+    """Exception building or opening a DniRegistry"""
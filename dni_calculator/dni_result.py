@@ -0,0 +1,39 @@
+from enum import IntEnum
+from typing import NamedTuple, Optional
+
+from dni_calculator import Dni, DniException, DniParseException
+
+
+class DniStatus(IntEnum):
+    """Outcome of a DniCalculatorProxy call"""
+
+    OK = 0
+    ALREADY_VALID = 1
+    NOT_FOUND = 2
+    PARSE_ERROR = 3
+    CALCULATION_ERROR = 4
+
+
+class DniResult(NamedTuple):
+    """Result of a DniCalculatorProxy call, when errors are not printed
+
+    Attributes:
+        status: The outcome of the call
+        dni: The resulting dni. None unless status is OK or ALREADY_VALID
+        error: The exception raised when status is PARSE_ERROR or
+            CALCULATION_ERROR. None otherwise
+    """
+
+    status: DniStatus
+    dni: Optional[Dni] = None
+    error: Optional[DniException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (DniStatus.OK, DniStatus.ALREADY_VALID)
+
+    @staticmethod
+    def from_exception(error: DniException) -> "DniResult":
+        if isinstance(error, DniParseException):
+            return DniResult(DniStatus.PARSE_ERROR, error=error)
+        return DniResult(DniStatus.CALCULATION_ERROR, error=error)
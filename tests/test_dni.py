@@ -28,12 +28,31 @@ class TestDni:
         dni = Dni(11_111_111, "H")
         assert str(dni) == "11111111H"
 
+    def test_format_block(self):
+        numbers = [1_111_111, 11_111_111, 0]
+        expected = "".join(f"{Dni(number, 'h')}\n" for number in numbers)
+        assert Dni.format_block(numbers, "h") == expected.encode("ascii")
+
+    def test_str_nie(self):
+        assert str(Dni(1_234_567, "L", nie=True)) == "X1234567L"
+        assert str(Dni(21_234_567, "L", nie=True)) == "Z1234567L"
+        assert str(Dni(1_234_567, "L", missing_digits=[0, 7], nie=True)) == "?123456?L"
+
+    def test_format_block_nie(self):
+        numbers = [1_111_111, 11_111_111, 20_000_000]
+        expected = "".join(f"{Dni(number, 'h', nie=True)}\n" for number in numbers)
+        assert Dni.format_block(numbers, "h", nie=True) == expected.encode("ascii")
+
+    def test_format_block_empty(self):
+        assert Dni.format_block([], "H") == b""
+
     def test_copy(self):
         dni = Dni(11_111_110, "H", missing_digits=[7])
         copied_dni = dni.copy()
         assert dni == copied_dni
         assert id(dni) != id(copied_dni)
         assert id(dni.missing_digits) != id(copied_dni.missing_digits)
+        assert Dni(1_111_111, "H", nie=True).copy().nie
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 from typing import Iterable, Generator
+import collections
+import itertools
 import logging
+import random
 
 import pytest
 
@@ -36,6 +39,15 @@ class TestDniCalculator:
         Dni(11_111_101, missing_digits=[4]),
     )
 
+    AGGREGATE_INPUT_DNIS = (
+        Dni(1234, "K", missing_digits=[0, 1, 2, 3]),
+        Dni(1234, "K", missing_digits=[3, 0, 1, 2]),
+        Dni(10_101_010, "T", missing_digits=[1, 3, 5]),
+        Dni(5240700, "Q", missing_digits=[6, 7]),
+        Dni(11_111_111, "H"),
+        Dni(11_111_110, "I", missing_digits=[7]),
+    )
+
     dni_calc = DniCalculator()
 
     def test__get_generator_for_digit(self):
@@ -106,6 +118,12 @@ class TestDniCalculator:
         expected_dni = Dni(11_111_111, "H")
         assert self.dni_calc.find_letter(input_dni) == expected_dni
 
+    def test_find_letter_valid_dni_provided_not_verbose(self, capsys):
+        dni_calc = DniCalculator(verbose=False)
+        dni_calc.find_letter(Dni(11_111_111, "H"))
+        next(dni_calc.find_all_possible_dnis(Dni(11_111_111, "H")))
+        assert capsys.readouterr().out == ""
+
     def test_find_letter_different_instance(self):
         input_dni = Dni(11_111_111)
         assert id(self.dni_calc.find_letter(input_dni)) != id(input_dni)
@@ -206,6 +224,293 @@ class TestDniCalculator:
         res_dni = next(self.dni_calc.find_all_possible_dnis(input_dni))
         assert id(res_dni) != id(input_dni)
 
+    def test_find_all_possible_dnis_shards(self):
+        self.test_find_all_possible_dnis_shards_slow(max_missing_numbers=4)
+
+    @pytest.mark.slow
+    def test_find_all_possible_dnis_shards_slow(
+        self, max_missing_numbers: int = Dni.LENGTH_NUMS_ONLY - 2
+    ):
+        input_dnis = tuple(
+            self._generate_dnis_with_missing_numbers(max_missing_numbers)
+        ) + (
+            Dni(5240700, "Q", missing_digits=[6, 7]),
+            Dni(10_101_010, "T", missing_digits=[1, 3, 5]),
+            Dni(11_111_111, "I", missing_digits=[7]),
+        )
+        for input_dni in input_dnis:
+            expected_dnis = tuple(self.dni_calc.find_all_possible_dnis(input_dni))
+            for shard_count in (1, 2, 3, 7, 100):
+                LOGGER.info(f"Testing {repr(input_dni)} in {shard_count} shards")
+                shards = [
+                    tuple(
+                        self.dni_calc.find_all_possible_dnis(
+                            input_dni, shard_index, shard_count
+                        )
+                    )
+                    for shard_index in range(shard_count)
+                ]
+                assert sum(shards, ()) == expected_dnis
+                shard_sizes = [len(shard) for shard in shards]
+                assert max(shard_sizes) - min(shard_sizes) <= 1
+
+    def test_find_all_possible_dnis_shards_valid_dni_provided(self):
+        input_dni = Dni(11_111_111, "H")
+        shards = [
+            tuple(self.dni_calc.find_all_possible_dnis(input_dni, shard_index, 3))
+            for shard_index in range(3)
+        ]
+        assert shards == [(), (), (Dni(11_111_111, "H"),)]
+
+    def test_find_all_possible_dnis_invalid_shard(self):
+        input_dni = Dni(5240700, "Q", missing_digits=[6, 7])
+        for shard_index, shard_count in ((0, 0), (-1, 2), (2, 2)):
+            LOGGER.info(f"Testing shard {shard_index} of {shard_count}")
+            with pytest.raises(DniCalculationException):
+                next(
+                    self.dni_calc.find_all_possible_dnis(
+                        input_dni, shard_index, shard_count
+                    )
+                )
+
+    def test_find_all_possible_number_blocks(self):
+        input_dnis = (
+            Dni(5240700, "Q", missing_digits=[6, 7]),
+            Dni(10_000_000, "Z", missing_digits=[1, 2, 3, 5, 7]),
+            Dni(11_111_111, "H"),
+            Dni(11_111_111, "I", missing_digits=[7]),
+            Dni(11, "X", missing_digits=[0, 1, 2, 3, 4, 5]),
+        )
+        for input_dni in input_dnis:
+            dnis = self.dni_calc.find_all_possible_dnis(input_dni)
+            expected = [dni.number for dni in dnis]
+            for block_size in (1, 3, 1000, 100_000):
+                LOGGER.info(f"Testing {repr(input_dni)} in blocks of {block_size}")
+                blocks = list(
+                    self.dni_calc.find_all_possible_number_blocks(input_dni, block_size)
+                )
+                assert list(itertools.chain.from_iterable(blocks)) == expected
+                assert all(len(block) == block_size for block in blocks[:-1])
+
+    def test_find_all_possible_number_blocks_all_missing(self):
+        input_dni = Dni(0, "T", missing_digits=list(range(Dni.LENGTH_NUMS_ONLY)))
+        count = 0
+        for block in self.dni_calc.find_all_possible_number_blocks(input_dni, 100):
+            assert len(block) == 100 or count + len(block) == 4_347_827
+            count += len(block)
+        assert count == self.dni_calc.count_possible_dnis(input_dni)
+
+    def test_find_all_possible_number_blocks_shards(self):
+        input_dni = Dni(10_101_010, "T", missing_digits=[1, 3, 5])
+        expected = [
+            dni.number for dni in self.dni_calc.find_all_possible_dnis(input_dni, 1, 3)
+        ]
+        blocks = self.dni_calc.find_all_possible_number_blocks(input_dni, 4, 1, 3)
+        assert sum(blocks, []) == expected
+
+        input_dnis = (
+            Dni(11, "X", missing_digits=[0, 1, 2, 3, 4]),
+            Dni(5240700, "Q", missing_digits=[6, 7]),
+            Dni(11_111_110, "A", missing_digits=[7]),
+            Dni(1_234_000, "L", missing_digits=[0, 5, 6, 7], nie=True),
+        )
+        for input_dni in input_dnis:
+            for shard_count in (2, 7, 100):
+                LOGGER.info(f"Testing {repr(input_dni)} in {shard_count} shards")
+                for shard_index in range(shard_count):
+                    dnis = self.dni_calc.find_all_possible_dnis(
+                        input_dni, shard_index, shard_count
+                    )
+                    blocks = list(
+                        self.dni_calc.find_all_possible_number_blocks(
+                            input_dni, 7, shard_index, shard_count
+                        )
+                    )
+                    assert sum(blocks, []) == [dni.number for dni in dnis]
+                    assert all(len(block) == 7 for block in blocks[:-1])
+
+    def test_find_all_possible_number_blocks_invalid_input(self):
+        input_dni = Dni(5240700, "Q", missing_digits=[6, 7])
+        for invalid_dni, block_size in (
+            (Dni(11_111_111, "G"), 10),
+            (Dni(11_111_101, missing_digits=[4]), 10),
+            (input_dni, 0),
+        ):
+            LOGGER.info(f'Testing "{repr(invalid_dni)}" in blocks of {block_size}')
+            with pytest.raises(DniCalculationException):
+                blocks = self.dni_calc.find_all_possible_number_blocks(
+                    invalid_dni, block_size
+                )
+                next(blocks)
+
+    def test_top_k_possible_dnis(self):
+        rng = random.Random(0)
+        for input_dni in (
+            Dni(5240700, "Q", missing_digits=[6, 7]),
+            Dni(10_000_000, "Z", missing_digits=[1, 3, 5, 7]),
+            Dni(1_091_510, "M", missing_digits=[0, 7]),
+        ):
+            weights = [
+                [rng.choice((0, 1, 2, 5, 10)) for _ in range(10)]
+                for _ in input_dni.missing_digits
+            ]
+            weights[0] = None
+
+            def likelihood(dni: Dni) -> int:
+                digits = f"{dni.number:08d}"
+                res = 1
+                for digit_weights, pos in zip(weights, input_dni.missing_digits):
+                    if digit_weights is not None:
+                        res *= digit_weights[int(digits[pos])]
+                return res
+
+            dnis = [
+                dni
+                for dni in self.dni_calc.find_all_possible_dnis(input_dni)
+                if likelihood(dni) > 0
+            ]
+            for k in (0, 1, 10, len(dnis) + 1):
+                LOGGER.info(f"Testing top {k} of {repr(input_dni)}")
+                top_k = self.dni_calc.top_k_possible_dnis(input_dni, weights, k)
+                assert len(top_k) == min(k, len(dnis))
+                assert all(dni in dnis for dni in top_k)
+                assert [likelihood(dni) for dni in top_k] == sorted(
+                    (likelihood(dni) for dni in dnis), reverse=True
+                )[:k]
+
+    def test_top_k_possible_dnis_single_dni(self):
+        input_dni = Dni(5240700, "Q", missing_digits=[6, 7])
+        weights = [None, [0.3, 0, 0, 0.6, 0.1, 0, 0, 0, 0, 0]]
+        assert self.dni_calc.top_k_possible_dnis(input_dni, weights, 2) == [
+            Dni(5240773, "Q"),
+            Dni(5240750, "Q"),
+        ]
+        assert self.dni_calc.top_k_possible_dnis(Dni(11_111_111, "H"), [], 3) == [
+            Dni(11_111_111, "H")
+        ]
+        assert self.dni_calc.top_k_possible_dnis(
+            Dni(11_111_110, "H", missing_digits=[7]), [[1] * 10], 3
+        ) == [Dni(11_111_111, "H")]
+        assert self.dni_calc.top_k_possible_dnis(
+            Dni(11_111_110, "H", missing_digits=[7]), [[0] + [1] * 9], 3
+        ) == [Dni(11_111_111, "H")]
+        assert (
+            self.dni_calc.top_k_possible_dnis(
+                Dni(11_111_110, "H", missing_digits=[7]), [[1] + [0] * 9], 3
+            )
+            == []
+        )
+
+    def test_top_k_possible_dnis_invalid_input(self):
+        input_dni = Dni(5240700, "Q", missing_digits=[6, 7])
+        for invalid_dni, weights, k in (
+            (Dni(11_111_101, missing_digits=[4]), [None], 1),
+            (input_dni, [None], 1),
+            (input_dni, [None, [1] * 9], 1),
+            (input_dni, [None, [-1] + [1] * 9], 1),
+            (input_dni, [None, None], -1),
+        ):
+            LOGGER.info(f"Testing {repr(invalid_dni)} with {weights} and k={k}")
+            with pytest.raises(DniCalculationException):
+                self.dni_calc.top_k_possible_dnis(invalid_dni, weights, k)
+
+    def test_count_possible_dnis_by_prefix(self):
+        for input_dni in self.AGGREGATE_INPUT_DNIS:
+            dnis = list(self.dni_calc.find_all_possible_dnis(input_dni))
+            for prefix_length in range(Dni.LENGTH_NUMS_ONLY + 1):
+                LOGGER.info(f"Testing {repr(input_dni)} by {prefix_length} digits")
+                prefix_divisor = 10 ** (Dni.LENGTH_NUMS_ONLY - prefix_length)
+                expected = collections.Counter(
+                    dni.number // prefix_divisor for dni in dnis
+                )
+                counts = self.dni_calc.count_possible_dnis_by_prefix(
+                    input_dni, prefix_length
+                )
+                assert counts == expected
+                assert list(counts) == sorted(counts)
+        counts = self.dni_calc.count_possible_dnis_by_prefix(
+            Dni(1234, "K", missing_digits=[3, 0, 1, 2]), 1
+        )
+        assert sum(counts.values()) == 435
+
+    def test_count_possible_dnis_in_range(self):
+        rng = random.Random(0)
+        for input_dni in self.AGGREGATE_INPUT_DNIS:
+            numbers = [
+                dni.number for dni in self.dni_calc.find_all_possible_dnis(input_dni)
+            ]
+            bounds = [(-1, 10 ** Dni.LENGTH_NUMS_ONLY + 1), (30_000_000, 40_000_000)]
+            if numbers:
+                bounds.extend(
+                    (
+                        (numbers[0], numbers[-1]),
+                        (numbers[-1], numbers[0]),
+                        (numbers[-1], numbers[-1] + 1),
+                    )
+                )
+            bounds.extend(
+                sorted(rng.randrange(10 ** Dni.LENGTH_NUMS_ONLY) for _ in range(2))
+                for _ in range(20)
+            )
+            for lower, upper in bounds:
+                LOGGER.info(f"Testing {repr(input_dni)} in [{lower}, {upper})")
+                expected = sum(lower <= number < upper for number in numbers)
+                count = self.dni_calc.count_possible_dnis_in_range(
+                    input_dni, lower, upper
+                )
+                assert count == expected
+
+    def test_count_possible_dnis_aggregates_invalid_input(self):
+        for invalid_dni in self.INVALID_DNIS_MISSING_NUM:
+            LOGGER.info(f"Testing {repr(invalid_dni)}")
+            with pytest.raises(DniCalculationException):
+                self.dni_calc.count_possible_dnis_by_prefix(invalid_dni, 2)
+            with pytest.raises(DniCalculationException):
+                self.dni_calc.count_possible_dnis_in_range(invalid_dni, 0, 10)
+        input_dni = Dni(5240700, "Q", missing_digits=[6, 7])
+        for prefix_length in (-1, Dni.LENGTH_NUMS_ONLY + 1):
+            with pytest.raises(DniCalculationException):
+                self.dni_calc.count_possible_dnis_by_prefix(input_dni, prefix_length)
+
+    def test_nie(self):
+        nie_prefix_bound = len(Dni.NIE_PREFIXES) * 10 ** (Dni.LENGTH_NUMS_ONLY - 1)
+        for input_nie in (
+            Dni(1_111_011, "H", missing_digits=[0, 5], nie=True),
+            Dni(1_234, "K", missing_digits=[0, 1, 2, 3], nie=True),
+            Dni(10_000_000, "T", missing_digits=[2, 4, 6], nie=True),
+            Dni(1_234_567, "L", missing_digits=[0], nie=True),
+        ):
+            LOGGER.info(f"Testing {repr(input_nie)}")
+            input_dni = input_nie.copy()
+            input_dni.nie = False
+            expected = [
+                Dni(dni.number, dni.letter, nie=True)
+                for dni in self.dni_calc.find_all_possible_dnis(input_dni)
+                if dni.number < nie_prefix_bound
+            ]
+            assert list(self.dni_calc.find_all_possible_dnis(input_nie)) == expected
+            assert self.dni_calc.count_possible_dnis(input_nie) == len(expected)
+            assert self.dni_calc.find_missing_num(input_nie) == expected[0]
+            shards = [
+                self.dni_calc.find_all_possible_dnis(input_nie, shard_index, 3)
+                for shard_index in range(3)
+            ]
+            assert list(itertools.chain.from_iterable(shards)) == expected
+            blocks = self.dni_calc.find_all_possible_number_blocks(input_nie, 7)
+            assert list(itertools.chain.from_iterable(blocks)) == [
+                dni.number for dni in expected
+            ]
+            top_k = self.dni_calc.top_k_possible_dnis(
+                input_nie, [None] * len(input_nie.missing_digits), len(expected) + 1
+            )
+            assert sorted(top_k, key=lambda dni: dni.number) == expected
+            assert self.dni_calc.count_possible_dnis_by_prefix(
+                input_nie, 2
+            ) == collections.Counter(dni.number // 10 ** 6 for dni in expected)
+            assert self.dni_calc.count_possible_dnis_in_range(
+                input_nie, 1_500_000, 25_000_000
+            ) == sum(1_500_000 <= dni.number < 25_000_000 for dni in expected)
+
     def _generate_dnis_with_missing_numbers(
         self, max_missing_numbers: int = Dni.LENGTH_NUMS_ONLY
     ) -> Generator[Dni, None, None]:
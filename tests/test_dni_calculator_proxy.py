@@ -1,9 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Generator
 import logging
 
 import pytest
 
-from dni_calculator import DniCalculatorProxy, Dni
+from dni_calculator import DniCalculatorProxy, Dni, DniException, DniResult, DniStatus
 from tests import utils
 
 
@@ -111,6 +112,209 @@ class TestDniCalculatorProxy:
             self.dni_calc.find_all_possible_dnis("11_111_111-H"), (expected_dni,)
         )
 
+    def test_find_all_possible_dnis_shards(self):
+        dni_str = "11-?11-1?1-H"
+        expected_dnis = tuple(self.dni_calc.find_all_possible_dnis(dni_str))
+        shards = tuple(
+            dni
+            for shard_index in range(3)
+            for dni in self.dni_calc.find_all_possible_dnis(dni_str, shard_index, 3)
+        )
+        assert shards == expected_dnis
+
+    def test_find_all_possible_dnis_invalid_shard(self):
+        dnis = self.dni_calc.find_all_possible_dnis("11-?11-1?1-H", 3, 3)
+        assert next(dnis, None) is None
+
+    def test_validate(self):
+        assert self.dni_calc.validate("11.111.111-H")
+        for invalid_dni in self.INVALID_DNIS_MISSING_NUM + ("11_111_111-?",):
+            LOGGER.info(f'Testing "{invalid_dni}"')
+            assert not self.dni_calc.validate(invalid_dni)
+
+    def test_map_find_letter(self):
+        dni_strs = [f"{number:08d}" for number in range(0, 10 ** 8, 99_991)]
+        dni_strs += list(self.INVALID_DNIS_FIND_LETTER)
+        expected_dnis = [self.dni_calc.find_letter(dni_str) for dni_str in dni_strs]
+        assert self.dni_calc.map_find_letter(dni_strs, chunk_size=7) == expected_dnis
+
+    def test_map_validate(self):
+        dnis = self.dni_calc.find_all_possible_dnis("??111111H")
+        dni_strs = [str(dni) for dni in dnis]
+        dni_strs += list(self.INVALID_DNIS_MISSING_NUM)
+        expected = [True] * (len(dni_strs) - len(self.INVALID_DNIS_MISSING_NUM))
+        expected += [False] * len(self.INVALID_DNIS_MISSING_NUM)
+        with ThreadPoolExecutor(4) as executor:
+            assert (
+                self.dni_calc.map_validate(dni_strs, chunk_size=3, executor=executor)
+                == expected
+            )
+
+    def test_map_invalid_chunk_size(self):
+        with pytest.raises(DniException):
+            self.dni_calc.map_validate(["11111111H"], chunk_size=0)
+
+    def test_immutable(self):
+        with pytest.raises(AttributeError):
+            self.dni_calc.parser = None
+        with pytest.raises(AttributeError):
+            self.dni_calc.dni_calc = None
+        with pytest.raises(AttributeError):
+            self.dni_calc.dni_calc.engine = None
+
+    def test_find_all_possible_dni_blocks(self):
+        for dni_str in ("11-?11-1?1-H", "1?????11H", "11_111_111-H"):
+            LOGGER.info(f'Testing "{dni_str}"')
+            expected = "".join(
+                f"{dni}\n" for dni in self.dni_calc.find_all_possible_dnis(dni_str)
+            )
+            blocks = self.dni_calc.find_all_possible_dni_blocks(dni_str, block_size=7)
+            assert b"".join(blocks) == expected.encode("ascii")
+
+    def test_find_all_possible_dni_blocks_invalid_input(self):
+        for invalid_dni in self.INVALID_DNIS_MISSING_NUM:
+            LOGGER.info(f'Testing "{invalid_dni}"')
+            blocks = self.dni_calc.find_all_possible_dni_blocks(invalid_dni)
+            assert next(blocks, None) is None
+
+    def test_structured_find_all_possible_dni_blocks(self):
+        dni_calc = DniCalculatorProxy(structured=True)
+        assert list(dni_calc.find_all_possible_dni_blocks("11-?11-1?1-H")) == [
+            b"11111111H\n11211161H\n11611131H\n11711181H\n"
+        ]
+        assert list(dni_calc.find_all_possible_dni_blocks("11_111_111-H")) == [
+            DniResult(DniStatus.ALREADY_VALID, Dni(11_111_111, "H"))
+        ]
+        (result,) = dni_calc.find_all_possible_dni_blocks("11.1F1.111-E")
+        assert result.status == DniStatus.PARSE_ERROR
+
+    def test_structured_find_letter(self, capsys):
+        dni_calc = DniCalculatorProxy(structured=True)
+        assert dni_calc.find_letter("11_111_111") == DniResult(
+            DniStatus.OK, Dni(11_111_111, "H")
+        )
+        for invalid_dni in self.INVALID_DNIS_FIND_LETTER:
+            LOGGER.info(f'Testing dni: "{invalid_dni}"')
+            result = dni_calc.find_letter(invalid_dni)
+            assert not result.ok
+            assert result.status in (
+                DniStatus.PARSE_ERROR,
+                DniStatus.CALCULATION_ERROR,
+            )
+            assert result.dni is None
+            assert isinstance(result.error, DniException)
+        assert capsys.readouterr().out == ""
+
+    def test_structured_find_missing_num(self, capsys):
+        dni_calc = DniCalculatorProxy(structured=True)
+        assert dni_calc.find_missing_num("11_111_?11H") == DniResult(
+            DniStatus.OK, Dni(11_111_111, "H")
+        )
+        assert dni_calc.find_missing_num("11_111_111-H") == DniResult(
+            DniStatus.ALREADY_VALID, Dni(11_111_111, "H")
+        )
+        assert dni_calc.find_missing_num("11_111_11?-I") == DniResult(
+            DniStatus.NOT_FOUND
+        )
+        for invalid_dni, status in (
+            ("11.111.111-E", DniStatus.CALCULATION_ERROR),
+            ("11_111.1?1?", DniStatus.CALCULATION_ERROR),
+            ("11.1F1.111-E", DniStatus.PARSE_ERROR),
+        ):
+            LOGGER.info(f'Testing "{invalid_dni}"')
+            assert dni_calc.find_missing_num(invalid_dni).status == status
+        assert capsys.readouterr().out == ""
+
+    def test_structured_find_all_possible_dnis(self):
+        dni_calc = DniCalculatorProxy(structured=True)
+        results = tuple(dni_calc.find_all_possible_dnis("11-?11-1?1-H"))
+        assert all(result.status == DniStatus.OK for result in results)
+        assert tuple(result.dni for result in results) == tuple(
+            self.dni_calc.find_all_possible_dnis("11-?11-1?1-H")
+        )
+        (result,) = dni_calc.find_all_possible_dnis("11-?11-1?1-H", 3, 3)
+        assert result.status == DniStatus.CALCULATION_ERROR
+
+    def test_nie(self):
+        assert self.dni_calc.find_letter("X-1234567") == Dni(1_234_567, "L", nie=True)
+        assert self.dni_calc.validate("x1234567l")
+        assert not self.dni_calc.validate("y1234567l")
+        assert self.dni_calc.map_validate(["X1234567L", "01234567L", "Y1234567L"]) == [
+            True,
+            True,
+            False,
+        ]
+        assert list(self.dni_calc.find_all_possible_dnis("X-1?34567-L")) == [
+            Dni(1_234_567, "L", nie=True)
+        ]
+        blocks = b"".join(self.dni_calc.find_all_possible_dni_blocks("Z-12345??-L"))
+        assert blocks == "".join(
+            f"{dni}\n" for dni in self.dni_calc.find_all_possible_dnis("Z-12345??-L")
+        ).encode("ascii")
+        assert blocks.startswith(b"Z12345")
+
+    def test_nie_option(self):
+        nie_calc = DniCalculatorProxy(structured=True, nie=True)
+        assert list(self.dni_calc.find_all_possible_dnis("?1234567L")) == [
+            Dni(1_234_567, "L")
+        ]
+        assert list(nie_calc.find_all_possible_dnis("?1234567L")) == [
+            DniResult(DniStatus.OK, Dni(1_234_567, "L", nie=True))
+        ]
+        assert nie_calc.find_missing_num("?-12?4567-L") == DniResult(
+            DniStatus.OK, Dni(1_234_567, "L", nie=True)
+        )
+        assert list(nie_calc.find_all_possible_dni_blocks("?-12?4567-L")) == [
+            b"X1234567L\nZ1244567L\n"
+        ]
+        assert list(nie_calc.top_k_possible_dnis("?1234567L", [None], 1)) == [
+            DniResult(DniStatus.OK, Dni(1_234_567, "L", nie=True))
+        ]
+        assert nie_calc.find_letter("Y1234567") == DniResult(
+            DniStatus.OK, Dni(11_234_567, "X", nie=True)
+        )
+        assert nie_calc.find_letter("01234567").status == DniStatus.PARSE_ERROR
+        results = nie_calc.map_find_letter(["X1234567", "01234567"])
+        assert [result.status for result in results] == [
+            DniStatus.OK,
+            DniStatus.PARSE_ERROR,
+        ]
+        assert results[0].dni == Dni(1_234_567, "L", nie=True)
+        assert nie_calc.map_validate(["X1234567L", "01234567L", "?1234567L"]) == [
+            True,
+            False,
+            False,
+        ]
+        (result,) = nie_calc.find_all_possible_dnis("01234567L")
+        assert result.status == DniStatus.PARSE_ERROR
+
+    def test_structured_find_all_possible_dni_blocks_nie(self):
+        dni_calc = DniCalculatorProxy(structured=True)
+        assert list(dni_calc.find_all_possible_dni_blocks("X1234567L")) == [
+            DniResult(DniStatus.ALREADY_VALID, Dni(1_234_567, "L", nie=True))
+        ]
+
+    def test_top_k_possible_dnis(self):
+        weights = [None, [0.3, 0, 0, 0.6, 0.1, 0, 0, 0, 0, 0]]
+        assert list(self.dni_calc.top_k_possible_dnis("052407??Q", weights, 2)) == [
+            Dni(5240773, "Q"),
+            Dni(5240750, "Q"),
+        ]
+        assert list(self.dni_calc.top_k_possible_dnis("0524070?Q", weights[1:], 3)) == [
+            Dni(5240704, "Q")
+        ]
+
+    def test_structured_top_k_possible_dnis(self):
+        dni_calc = DniCalculatorProxy(structured=True)
+        assert list(dni_calc.top_k_possible_dnis("11_111_111-H", [], 1)) == [
+            DniResult(DniStatus.ALREADY_VALID, Dni(11_111_111, "H"))
+        ]
+        assert list(dni_calc.top_k_possible_dnis("11_111_11?-H", [None], 1)) == [
+            DniResult(DniStatus.OK, Dni(11_111_111, "H"))
+        ]
+        (result,) = dni_calc.top_k_possible_dnis("11_111_11?-H", [], 1)
+        assert result.status == DniStatus.CALCULATION_ERROR
+
     def _generate_dnis_with_missing_numbers(
         self, max_missing_numbers: int = Dni.LENGTH_NUMS_ONLY
     ) -> Generator[str, None, None]:
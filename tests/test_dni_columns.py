@@ -0,0 +1,140 @@
+import logging
+
+import pytest
+
+from dni_calculator import DniCalculatorProxy
+from dni_calculator.dni_columns import (
+    find_letter_column,
+    parse_dni_column,
+    validate_dni_column,
+)
+
+numpy = pytest.importorskip("numpy")
+
+
+LOGGER = logging.getLogger()
+
+
+class TestDniColumns:
+
+    DNIS = (
+        "11_111_111",
+        "11111111-H",
+        "11.111.111-h",
+        "11111111G",
+        None,
+        "1111111",
+        "1X111111",
+        "11-111-?11-H",
+        "",
+    )
+    EXPECTED_DNIS = (
+        "11111111H",
+        "11111111H",
+        "11111111H",
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+    )
+    EXPECTED_VALID = (False, True, True, False, False, False, False, False, False)
+
+    def test_parse_dni_column(self):
+        numbers, letters, valid, has_letter = parse_dni_column(self.DNIS)
+        assert numbers.tolist() == [11_111_111] * 3 + [0] * 6
+        assert letters.tolist() == ["H"] * 3 + [""] * 6
+        assert valid.tolist() == [True] * 3 + [False] * 6
+        assert has_letter.tolist() == [False, True, True] + [False] * 6
+        assert not parse_dni_column(self.DNIS, nie=True).nie.any()
+
+    def test_parse_dni_column_nies(self):
+        numbers, letters, valid, has_letter, nie = parse_dni_column(
+            ["X1234567", "y-1234567-x", "Z0000000M", "Z0000000H", "11111111H"],
+            nie=True,
+        )
+        assert numbers.tolist() == [1_234_567, 11_234_567, 20_000_000, 0, 11_111_111]
+        assert letters.tolist() == ["L", "X", "M", "", "H"]
+        assert valid.tolist() == [True, True, True, False, True]
+        assert has_letter.tolist() == [False, True, True, False, True]
+        assert nie.tolist() == [True, True, True, False, False]
+
+    def test_parse_dni_column_integers(self):
+        numbers, letters, valid, has_letter, nie = parse_dni_column(
+            numpy.array([11_111_111, 1_111_111, -1, 100_000_000]), nie=True
+        )
+        assert numbers.tolist() == [11_111_111, 1_111_111, 0, 0]
+        assert letters.tolist() == ["H", "G", "", ""]
+        assert valid.tolist() == [True, True, False, False]
+        assert not has_letter.any()
+        assert not nie.any()
+
+    def test_parse_dni_column_nulls(self, monkeypatch):
+        column = numpy.array(
+            ["11111111H", None, float("nan"), "11111111"], dtype=object
+        )
+        expected = [True, False, False, True]
+        assert parse_dni_column(column).valid.tolist() == expected
+        monkeypatch.setattr("dni_calculator.dni_columns.pandas", None)
+        assert parse_dni_column(column).valid.tolist() == expected
+
+    def test_find_letter_column_numpy(self):
+        dnis = find_letter_column(numpy.array(self.DNIS, dtype=object), chunk_size=2)
+        assert dnis.tolist() == list(self.EXPECTED_DNIS)
+
+    def test_find_letter_column_pandas(self):
+        pandas = pytest.importorskip("pandas")
+        column = pandas.Series(self.DNIS, index=range(10, 10 + len(self.DNIS)))
+        dnis = find_letter_column(column, chunk_size=4)
+        assert dnis.index.equals(column.index)
+        assert [None if pandas.isna(dni) else dni for dni in dnis] == list(
+            self.EXPECTED_DNIS
+        )
+
+    def test_find_letter_column_pandas_integers(self):
+        pandas = pytest.importorskip("pandas")
+        column = pandas.Series([11_111_111, None, 1_111_111], dtype="Int64")
+        dnis = find_letter_column(column)
+        assert [None if pandas.isna(dni) else dni for dni in dnis] == [
+            "11111111H",
+            None,
+            "01111111G",
+        ]
+
+    def test_find_letter_column_pyarrow(self):
+        pyarrow = pytest.importorskip("pyarrow")
+        column = pyarrow.chunked_array([self.DNIS[:4], self.DNIS[4:]])
+        dnis = find_letter_column(column, chunk_size=3)
+        assert dnis.to_pylist() == list(self.EXPECTED_DNIS)
+
+    def test_validate_dni_column(self):
+        assert validate_dni_column(self.DNIS).tolist() == list(self.EXPECTED_VALID)
+
+    def test_validate_dni_column_pyarrow(self):
+        pyarrow = pytest.importorskip("pyarrow")
+        valid = validate_dni_column(pyarrow.array(self.DNIS))
+        assert valid.to_pylist() == list(self.EXPECTED_VALID)
+
+    def test_find_letter_column_same_as_proxy(self):
+        dni_calc = DniCalculatorProxy()
+        numbers = numpy.random.default_rng(0).integers(0, 10 ** 8, 1000)
+        dnis = find_letter_column([f"{number:08d}" for number in numbers])
+        for number, dni in zip(numbers, dnis):
+            assert dni == str(dni_calc.find_letter(f"{number:08d}"))
+
+    def test_find_letter_column_nies_same_as_proxy(self):
+        dni_calc = DniCalculatorProxy()
+        numbers = numpy.random.default_rng(0).integers(0, 10 ** 7, 1000)
+        nies = [f"{prefix}{number:07d}" for prefix in "XYZ" for number in numbers]
+        for nie, dni in zip(nies, find_letter_column(nies)):
+            assert dni == str(dni_calc.find_letter(nie))
+
+    def test_find_letter_column_empty(self):
+        assert find_letter_column([]).tolist() == []
+        assert len(parse_dni_column([])) == 4
+        assert len(parse_dni_column([], nie=True)) == 5
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+from dni_calculator import Dni
+from dni_calculator import dni_digits
+
+
+LOGGER = logging.getLogger()
+
+
+class TestDniDigits:
+
+    INPUT_DNIS = (
+        Dni(5240700, "Q", missing_digits=[6, 7]),
+        Dni(10_101_010, "T", missing_digits=[1, 3, 5]),
+        Dni(1234, "K", missing_digits=[0, 1, 2, 3]),
+        Dni(1_234_000, "L", missing_digits=[0, 5, 6, 7], nie=True),
+        Dni(11_111_110, "U", missing_digits=[7]),
+    )
+
+    def test_get_letter_residue(self):
+        for residue, letter in enumerate(dni_digits.LETTERS[: dni_digits.MODULUS]):
+            assert dni_digits.get_letter_residue(letter) == residue
+            assert dni_digits.get_letter(residue + dni_digits.MODULUS) == letter
+        assert dni_digits.get_letter_residue("U") is None
+        assert dni_digits.get_letter_residue("?") is None
+
+    def test_count_valid_numbers(self):
+        for dni in self.INPUT_DNIS:
+            LOGGER.info(f"Testing {repr(dni)}")
+            assert dni_digits.count_valid_numbers(dni) == len(self._find_numbers(dni))
+        assert dni_digits.count_valid_numbers(Dni(11_111_111, "H")) == 1
+        assert dni_digits.count_valid_numbers(Dni(11_111_111, "G")) == 0
+
+    def test_get_nth_completion(self):
+        for dni in self.INPUT_DNIS:
+            LOGGER.info(f"Testing {repr(dni)}")
+            place_values = dni_digits.get_place_values(dni.missing_digits)
+            digits_values = dni_digits.get_digits_values(dni)
+            completion_counts = dni_digits.get_completion_counts(
+                place_values, digits_values
+            )
+            residue = dni_digits.get_letter_residue(dni.letter) or 0
+            needed_residue = (residue - dni.number) % dni_digits.MODULUS
+            for n, number in enumerate(self._find_numbers(dni)):
+                digits = dni_digits.get_nth_completion(
+                    place_values, completion_counts, needed_residue, n, digits_values
+                )
+                assert (
+                    dni.number + sum(map(int.__mul__, digits, place_values)) == number
+                )
+
+    def test_get_generator_for_digits_from(self):
+        numbers = dni_digits.get_generator_for_digits_from(1_000, (10, 1), (9, 8))
+        assert list(numbers) == [1_098, 1_099]
+        numbers = dni_digits.get_generator_for_digits_from(
+            0, (10_000_000, 1), (1, 9), [range(3), range(10)]
+        )
+        assert list(numbers) == [10_000_009] + [
+            20_000_000 + digit for digit in range(10)
+        ]
+
+    def test_clear_digits(self):
+        assert dni_digits.clear_digits(11_111_111, (100, 1)) == 11_111_010
+        assert dni_digits.clear_digits(11_111_111, ()) == 11_111_111
+
+    def _find_numbers(self, dni: Dni):
+        """Find the valid numbers for dni checking every candidate"""
+        return [
+            dni.number + digits
+            for digits in dni_digits.get_generator_for_digits(
+                dni.missing_digits, dni_digits.get_digits_values(dni)
+            )
+            if dni_digits.get_letter(dni.number + digits) == dni.letter
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,199 @@
+from typing import Generator
+import logging
+
+import pytest
+
+from dni_calculator import (
+    ArithmeticEngine,
+    AutoEngine,
+    BruteForceEngine,
+    DifferentialEngine,
+    Dni,
+    DniCalculationException,
+    DniCalculator,
+    DniEngine,
+    DniEnginePlanner,
+    NumpyEngine,
+    ProcessPoolEngine,
+)
+
+
+LOGGER = logging.getLogger()
+
+
+class TestDniEngine:
+
+    DNIS = (
+        Dni(5240700, "Q", missing_digits=[6, 7]),
+        Dni(10_101_010, "T", missing_digits=[1, 3, 5]),
+        Dni(11_011_111, "H", missing_digits=[2]),
+        Dni(11_111_111, "I", missing_digits=[7]),
+        Dni(0, "E", missing_digits=[0, 2, 4, 6, 7]),
+        Dni(1_111_011, "H", missing_digits=[0, 5], nie=True),
+        Dni(0, "T", missing_digits=[0, 1, 3, 5, 7], nie=True),
+        Dni(10_000_000, "Z", missing_digits=[1, 2, 3, 4, 5, 7]),
+    )
+
+    def _get_engines(self) -> Generator[DniEngine, None, None]:
+        yield ArithmeticEngine()
+        yield AutoEngine(DniEnginePlanner(arithmetic_threshold=1))
+        if NumpyEngine.is_available():
+            yield NumpyEngine()
+
+    def test_differential(self):
+        differential_engine = DifferentialEngine(self._get_engines())
+        for dni in self.DNIS:
+            LOGGER.info(f"Testing {repr(dni)}")
+            differential_engine.find_first_number(dni)
+            differential_engine.count(dni)
+            assert list(differential_engine.find_all_numbers(dni)) == list(
+                BruteForceEngine().find_all_numbers(dni)
+            )
+            assert list(differential_engine.find_number_blocks(dni, 100)) == list(
+                BruteForceEngine().find_number_blocks(dni, 100)
+            )
+
+    def test_find_number_blocks(self):
+        for engine in (BruteForceEngine(),) + tuple(self._get_engines()):
+            for dni in self.DNIS:
+                LOGGER.info(f"Testing {repr(engine)} with {repr(dni)}")
+                expected = list(engine.find_all_numbers(dni))
+                blocks = [list(block) for block in engine.find_number_blocks(dni, 100)]
+                assert sum(blocks, []) == expected
+                assert all(len(block) == 100 for block in blocks[:-1])
+
+    def test_differential_process_pool(self):
+        differential_engine = DifferentialEngine([ProcessPoolEngine(max_workers=2)])
+        for dni in (self.DNIS[0], self.DNIS[-2], self.DNIS[-1]):
+            assert list(differential_engine.find_all_numbers(dni))
+            assert list(differential_engine.find_number_blocks(dni, 1_000))
+
+    def test_differential_blocks_mismatch(self):
+        class WrongEngine(BruteForceEngine):
+            def find_number_blocks(self, dni: Dni, block_size: int):
+                # Right numbers, in blocks of the wrong size
+                return super().find_number_blocks(dni, block_size + 1)
+
+        differential_engine = DifferentialEngine([WrongEngine()])
+        with pytest.raises(DniCalculationException):
+            list(differential_engine.find_number_blocks(self.DNIS[-1], 100))
+
+    def test_auto_engine_find_number_blocks(self):
+        numpy = pytest.importorskip("numpy")
+        dni = self.DNIS[-1]
+        blocks = list(AutoEngine().find_number_blocks(dni, 1_000))
+        # Found by NumpyEngine, as chosen by the planner for blocks
+        assert all(isinstance(block, numpy.ndarray) for block in blocks)
+        assert numpy.concatenate(blocks).tolist() == list(
+            ArithmeticEngine().find_all_numbers(dni)
+        )
+
+    def test_differential_mismatch(self):
+        class WrongEngine(BruteForceEngine):
+            def count(self, dni: Dni) -> int:
+                return super().count(dni) + 1
+
+        differential_engine = DifferentialEngine([WrongEngine()])
+        with pytest.raises(DniCalculationException):
+            differential_engine.count(self.DNIS[0])
+
+    def test_engine_without_find_all_numbers(self):
+        class IncompleteEngine(DniEngine):
+            def count(self, dni: Dni) -> int:
+                return 0
+
+        with pytest.raises(TypeError):
+            IncompleteEngine()
+
+    def test_dni_calculator_with_engine(self):
+        reference_calc = DniCalculator()
+        dni_calc = DniCalculator(AutoEngine())
+        for dni in self.DNIS:
+            LOGGER.info(f"Testing {repr(dni)}")
+            assert tuple(dni_calc.find_all_possible_dnis(dni)) == tuple(
+                reference_calc.find_all_possible_dnis(dni)
+            )
+            assert dni_calc.count_possible_dnis(
+                dni
+            ) == reference_calc.count_possible_dnis(dni)
+
+    def test_dni_calculator_with_engine_find_missing_num(self):
+        dni_calc = DniCalculator(AutoEngine())
+        input_dni = Dni(5240700, "Q", missing_digits=[6, 7])
+        assert dni_calc.find_missing_num(input_dni) == Dni(5240704, "Q")
+        with pytest.raises(DniCalculationException):
+            dni_calc.find_missing_num(Dni(11_111_111, "I", missing_digits=[7]))
+
+    def test_planner_choose(self):
+        planner = DniEnginePlanner(
+            arithmetic_threshold=10 ** 2,
+            numpy_threshold=10 ** 5,
+            process_pool_threshold=10 ** 7,
+        )
+        few_missing = Dni(11_111_111, "H", missing_digits=[7])
+        many_missing = Dni(10_000_000, "H", missing_digits=[1, 2, 3, 4, 5, 6])
+        all_missing = Dni(0, "H", missing_digits=list(range(Dni.LENGTH_NUMS_ONLY)))
+        assert isinstance(planner.choose(few_missing), BruteForceEngine)
+        assert isinstance(
+            planner.choose(all_missing, DniEnginePlanner.COUNT), ArithmeticEngine
+        )
+        assert isinstance(
+            planner.choose(all_missing, DniEnginePlanner.FIRST), ArithmeticEngine
+        )
+        assert isinstance(planner.choose(all_missing), ProcessPoolEngine)
+        if NumpyEngine.is_available():
+            assert isinstance(planner.choose(many_missing), NumpyEngine)
+            assert isinstance(
+                planner.choose(all_missing, DniEnginePlanner.BLOCKS), NumpyEngine
+            )
+        with pytest.raises(DniCalculationException):
+            planner.choose(few_missing, "last")
+
+    def test_planner_choose_disabled(self):
+        planner = DniEnginePlanner(
+            numpy_threshold=None,
+            numpy_blocks_threshold=None,
+            process_pool_threshold=None,
+        )
+        all_missing = Dni(0, "H", missing_digits=list(range(Dni.LENGTH_NUMS_ONLY)))
+        for output in (DniEnginePlanner.ALL, DniEnginePlanner.BLOCKS):
+            assert type(planner.choose(all_missing, output)) is ArithmeticEngine
+        planner.arithmetic_threshold = None
+        assert isinstance(
+            planner.choose(all_missing, DniEnginePlanner.COUNT), BruteForceEngine
+        )
+
+    def test_planner_calibrate(self):
+        planner = DniEnginePlanner()
+        planner.calibrate(max_missing_digits=5, repeat=1)
+        assert planner.arithmetic_threshold >= 10
+        for threshold in (planner.numpy_threshold, planner.numpy_blocks_threshold):
+            # NumpyEngine can only be chosen with more than INNER_DIGITS missing
+            assert threshold is None or threshold == 10 ** 5
+        assert planner.process_pool_threshold == 10 ** 8
+
+    @pytest.mark.skipif(not NumpyEngine.is_available(), reason="requires numpy")
+    def test_planner_calibrate_disables(self, monkeypatch):
+        def time_engine(engine, dni, output, repeat):
+            LOGGER.info(f"Timing {engine!r} on {repr(dni)} for {output}")
+            # NumpyEngine only wins finding blocks with 6 missing digits
+            if isinstance(engine, NumpyEngine):
+                # Never measured where choose can not route to it
+                assert len(dni.missing_digits) > ArithmeticEngine.INNER_DIGITS
+                return 0 if output == "blocks" and len(dni.missing_digits) == 6 else 2
+            return 1 if isinstance(engine, ArithmeticEngine) else 3
+
+        monkeypatch.setattr("dni_calculator.dni_engine._time_engine", time_engine)
+        planner = DniEnginePlanner()
+        planner.calibrate(max_missing_digits=6, repeat=1)
+        assert planner.numpy_threshold is None
+        assert planner.numpy_blocks_threshold == 10 ** 6
+        many_missing = Dni(10_000_000, "H", missing_digits=[1, 2, 3, 4, 5, 6])
+        assert type(planner.choose(many_missing)) is ArithmeticEngine
+        assert isinstance(
+            planner.choose(many_missing, DniEnginePlanner.BLOCKS), NumpyEngine
+        )
+
+
+if __name__ == "__main__":
+    pytest.main()
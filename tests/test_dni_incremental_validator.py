@@ -0,0 +1,136 @@
+import logging
+
+import pytest
+
+from dni_calculator import (
+    Dni,
+    DniCalculator,
+    DniIncrementalValidator,
+    DniParser,
+    DniParseException,
+)
+from dni_calculator.dni_digits import LETTERS
+
+
+LOGGER = logging.getLogger()
+
+
+class TestDniIncrementalValidator:
+
+    DNI_STRS = (
+        "11_111_111-H",
+        "11-?11-1?1-H",
+        "052407??q",
+        "1111111?I",
+        "????1234-K",
+        "1?1?1?1?-?",
+        "11.111.111-G",
+        "X1234567L",
+        "x-123?567-l",
+        "Z?2?4?6?Q",
+    )
+
+    NIE_STRS = ("?1234567L", "?-1?1?1?1-T", "Y?2?4?6?Q", "?1111111?")
+
+    INVALID_INPUTS = (
+        ("1111111", "A"),
+        ("11111111", "1"),
+        ("11111111H", "H"),
+        ("11111111?", "1"),
+        ("11111111", "²"),
+    )
+
+    dni_calc = DniCalculator(verbose=False)
+    parser = DniParser()
+
+    def test_count_completions(self):
+        for dni_str in self.DNI_STRS:
+            validator = DniIncrementalValidator()
+            for char in dni_str:
+                validator.append(char)
+                LOGGER.info(f'Testing "{validator.text}"')
+                expected = self._count_completions(validator.text)
+                assert validator.count_completions() == expected
+                assert validator.is_completable == (expected > 0)
+
+    def test_count_completions_nie(self):
+        for nie_str in self.NIE_STRS:
+            validator = DniIncrementalValidator(nie=True)
+            for char in nie_str:
+                validator.append(char)
+                LOGGER.info(f'Testing NIE "{validator.text}"')
+                expected = self._count_completions(validator.text, nie=True)
+                assert validator.count_completions() == expected
+                assert validator.nie
+
+    def test_delete(self):
+        for dni_str in self.DNI_STRS:
+            LOGGER.info(f'Testing "{dni_str}"')
+            validator = DniIncrementalValidator(dni_str)
+            for length in reversed(range(len(dni_str))):
+                validator.delete()
+                assert validator.text == dni_str[:length]
+                assert validator.count_completions() == self._count_completions(
+                    dni_str[:length]
+                )
+        validator = DniIncrementalValidator("1111")
+        validator.delete(10)
+        assert validator.text == ""
+        assert validator.count_completions() == 10 ** Dni.LENGTH_NUMS_ONLY
+
+    def test_letter(self):
+        validator = DniIncrementalValidator("11_111_11")
+        assert validator.letter is None
+        validator.append("1")
+        assert validator.letter == "H"
+        validator.append("G")
+        assert validator.letter == "H"
+        assert not validator.is_valid
+        assert not validator.is_completable
+        validator.delete()
+        validator.append("h")
+        assert validator.is_valid
+        assert DniIncrementalValidator("11_111_11?").letter is None
+        assert DniIncrementalValidator("11_111_111?").letter == "H"
+        assert not DniIncrementalValidator("11_111_111?").is_valid
+        assert DniIncrementalValidator("X1234567").letter == "L"
+        assert DniIncrementalValidator("X1234567L").is_valid
+        assert DniIncrementalValidator("X1234567L").nie
+        assert not DniIncrementalValidator("01234567").nie
+        assert DniIncrementalValidator("01234567L").is_valid
+
+    def test_invalid_input(self):
+        for dni_str, char in self.INVALID_INPUTS:
+            LOGGER.info(f'Testing "{dni_str}" followed by "{char}"')
+            validator = DniIncrementalValidator(dni_str)
+            count = validator.count_completions()
+            with pytest.raises(DniParseException):
+                validator.append(char)
+            assert validator.text == dni_str
+            assert validator.count_completions() == count
+        with pytest.raises(DniParseException):
+            DniIncrementalValidator("1", nie=True)
+
+    def _count_completions(self, dni_str: str, nie: bool = False) -> int:
+        """Count the valid dnis dni_str can become with DniCalculator"""
+        dni_str = self.parser.pre_parse(dni_str)
+        number_str = dni_str[: Dni.LENGTH_NUMS_ONLY].ljust(Dni.LENGTH_NUMS_ONLY, "?")
+        letter = dni_str[Dni.LENGTH_NUMS_ONLY :] or "?"
+        parse = self.parser.parse_nie if nie else self.parser.parse_dni
+        dni = parse(number_str + letter)
+        if dni.letter is None and not dni.missing_digits:
+            return 1
+        if dni.letter is None:
+            return sum(
+                self.dni_calc.count_possible_dnis(
+                    Dni(dni.number, letter, dni.missing_digits, dni.nie)
+                )
+                for letter in set(LETTERS)
+            )
+        if not dni.missing_digits:
+            return int(self.dni_calc.find_letter(Dni(dni.number)).letter == dni.letter)
+        return self.dni_calc.count_possible_dnis(dni)
+
+
+if __name__ == "__main__":
+    pytest.main()
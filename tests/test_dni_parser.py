@@ -63,12 +63,45 @@ class TestDniParser:
             ("11.111.1?1-.X", Dni(11_111_101, "X", [6])),
             ("11.111.1?1-.?", Dni(11_111_101, None, [6])),
             (47968698j, Dni(47_968_698, "J")),
+            ("X1234567L", Dni(1_234_567, "L", nie=True)),
+            ("y-1234?67-?", Dni(11_234_067, None, [5], nie=True)),
+            ("?1234567L", Dni(1_234_567, "L", [0])),
         )
         for valid_dni, expected_dni in VALID_DNIS:
             LOGGER.info(f'Testing "{valid_dni}"')
             dni = self.dni_parser.parse_dni(valid_dni)
             assert dni == expected_dni
 
+    def test_parse_nie(self):
+        VALID_NIES = (
+            ("X1234567L", Dni(1_234_567, "L", nie=True)),
+            ("z.1234567.l", Dni(21_234_567, "L", nie=True)),
+            ("?-1234?67-L", Dni(1_234_067, "L", [0, 5], nie=True)),
+        )
+        for valid_nie, expected_dni in VALID_NIES:
+            LOGGER.info(f'Testing "{valid_nie}"')
+            assert self.dni_parser.parse_nie(valid_nie) == expected_dni
+
+        for invalid_nie in self.INVALID_DNIS + ("11111111H", "A1234567L", "X1234567"):
+            LOGGER.info(f'Testing "{invalid_nie}"')
+            with pytest.raises(DniParseException):
+                self.dni_parser.parse_nie(invalid_nie)
+
+    def test_parse_nie_without_letter(self):
+        VALID_NIES = (
+            ("Z1234567", Dni(21_234_567, nie=True)),
+            ("x-1234567", Dni(1_234_567, nie=True)),
+            ("?-1234?67", Dni(1_234_067, None, [0, 5], nie=True)),
+        )
+        for valid_nie, expected_dni in VALID_NIES:
+            LOGGER.info(f'Testing "{valid_nie}"')
+            assert self.dni_parser.parse_nie_without_letter(valid_nie) == expected_dni
+
+        for invalid_nie in ("", "01234567", "A1234567", "X1234567L", "X123456"):
+            LOGGER.info(f'Testing "{invalid_nie}"')
+            with pytest.raises(DniParseException):
+                self.dni_parser.parse_nie_without_letter(invalid_nie)
+
     def test_parse_dni_without_letters_valid_dnis(self):
         VALID_DNIS = (
             ("12345678", Dni(12_345_678)),
@@ -77,6 +110,7 @@ class TestDniParser:
             ("11.111.1?1-.", Dni(11_111_101, None, [6])),
             ("11.111.1?1-.", Dni(11_111_101, None, [6])),
             (47968698, Dni(47_968_698)),
+            ("Z1234567", Dni(21_234_567, nie=True)),
         )
         for valid_dni, expected_dni in VALID_DNIS:
             LOGGER.info(f'Testing "{valid_dni}"')
@@ -0,0 +1,159 @@
+from pathlib import Path
+import logging
+import random
+
+import pytest
+
+from dni_calculator import (
+    ArithmeticEngine,
+    BruteForceEngine,
+    Dni,
+    DniCalculator,
+    DniCalculatorProxy,
+    DniException,
+    DniRegistry,
+    DniRegistryException,
+)
+
+
+LOGGER = logging.getLogger()
+
+DNIS_DATA = Path(__file__).parent / "dnis_data.txt"
+
+
+class TestDniRegistry:
+
+    INPUT_DNIS = (
+        Dni(5240700, "Q", missing_digits=[6, 7]),
+        Dni(10_101_010, "T", missing_digits=[1, 3, 5]),
+        Dni(71_091_510, "M", missing_digits=[0, 7]),
+        Dni(11_111_111, "H"),
+        Dni(11_111_111, "I", missing_digits=[7]),
+        Dni(0, "E", missing_digits=[0, 2, 4, 6, 7]),
+        Dni(10_000_000, "Z", missing_digits=[2, 3, 4, 5, 6, 7]),
+    )
+
+    @pytest.fixture
+    def numbers(self):
+        rng = random.Random(0)
+        numbers = {rng.randrange(10 ** Dni.LENGTH_NUMS_ONLY) for _ in range(20_000)}
+        numbers.update((5240727, 5240773, 10_111_010, 11_111_111, 0, 99_999_999))
+        return sorted(numbers)
+
+    @pytest.fixture
+    def registry(self, tmp_path, numbers):
+        numbers = [f"{number:08d}" for number in reversed(numbers)]
+        path = tmp_path / "registry"
+        with DniRegistry.build(numbers + numbers[:100], path) as registry:
+            yield registry
+
+    def test_build(self, registry, numbers):
+        assert len(registry) == len(numbers)
+        assert list(registry.find_in_range(0, 10 ** Dni.LENGTH_NUMS_ONLY)) == numbers
+
+    def test_build_from_file(self, tmp_path):
+        with DniRegistry.build_from_file(DNIS_DATA, tmp_path / "registry") as registry:
+            with open(DNIS_DATA) as dnis_file:
+                expected = sorted({int(line.strip()[:-1]) for line in dnis_file})
+            assert list(registry.find_in_range(0, 10 ** 8)) == expected
+
+    def test_build_invalid_dnis(self, tmp_path):
+        for invalid_dni in ("1111?111H", "1X111111G", 10 ** 8, "X1234567L"):
+            LOGGER.info(f'Testing "{invalid_dni}"')
+            with pytest.raises(DniException):
+                DniRegistry.build([invalid_dni], tmp_path / "registry")
+
+    def test_open_invalid_registry(self, tmp_path):
+        path = tmp_path / "registry"
+        path.write_bytes(b"123")
+        with pytest.raises(DniRegistryException):
+            DniRegistry(path)
+
+    def test_empty_registry(self, tmp_path):
+        with DniRegistry.build([], tmp_path / "registry") as registry:
+            assert len(registry) == 0
+            assert 0 not in registry
+            assert list(registry.intersect(range(100))) == []
+
+    def test_close_while_finding_in_range(self, registry, numbers):
+        numbers_in_range = registry.find_in_range(0, 10 ** Dni.LENGTH_NUMS_ONLY)
+        assert next(numbers_in_range) == numbers[0]
+        registry.close()
+        registry.close()
+
+    def test_contains(self, registry, numbers):
+        for number in numbers[:100]:
+            assert number in registry
+            assert number + 1 in registry or number + 1 not in numbers
+
+    def test_intersect(self, registry, numbers):
+        numbers_set = set(numbers)
+        for candidates in (
+            numbers[::3],
+            range(0, 10 ** Dni.LENGTH_NUMS_ONLY, 1_000),
+            range(7, 10 ** Dni.LENGTH_NUMS_ONLY, 100_003),
+        ):
+            LOGGER.info(f"Testing {candidates[:3]}")
+            expected = [number for number in candidates if number in numbers_set]
+            assert list(registry.intersect(candidates)) == expected
+
+    def test_find_registered_dnis(self, registry, numbers):
+        numbers_set = set(numbers)
+        for dni_calc in (DniCalculator(), DniCalculator(ArithmeticEngine())):
+            for input_dni in self.INPUT_DNIS:
+                LOGGER.info(f"Testing {repr(input_dni)}")
+                expected = [
+                    dni
+                    for dni in dni_calc.find_all_possible_dnis(input_dni)
+                    if dni.number in numbers_set
+                ]
+                dnis = dni_calc.find_registered_dnis(input_dni, registry)
+                assert list(dnis) == expected
+
+    def test_find_registered_dnis_no_engine(self, registry, capsys):
+        dni_calc = DniCalculator(verbose=True)
+        for input_dni in (Dni(71_091_510, "M", missing_digits=[0, 7]), Dni(0, "T")):
+            LOGGER.info(f"Testing {repr(input_dni)}")
+            dnis = list(dni_calc.find_registered_dnis(input_dni, registry))
+            assert dnis == list(
+                DniCalculator(ArithmeticEngine()).find_registered_dnis(
+                    input_dni, registry
+                )
+            )
+        assert capsys.readouterr().out == ""
+
+    def test_find_registered_dnis_does_not_count_with_engine(
+        self, registry, monkeypatch
+    ):
+        def count(dni):
+            raise AssertionError(f"Counted {repr(dni)} with the engine")
+
+        engine = BruteForceEngine()
+        monkeypatch.setattr(engine, "count", count)
+        dni_calc = DniCalculator(engine)
+        for input_dni in self.INPUT_DNIS:
+            LOGGER.info(f"Testing {repr(input_dni)}")
+            assert list(dni_calc.find_registered_dnis(input_dni, registry)) == list(
+                DniCalculator().find_registered_dnis(input_dni, registry)
+            )
+
+    def test_find_registered_dnis_nie(self, registry):
+        with pytest.raises(DniException):
+            nie = Dni(1_111_011, "H", missing_digits=[0, 5], nie=True)
+            next(DniCalculator().find_registered_dnis(nie, registry))
+
+    def test_proxy_find_registered_dnis(self, registry):
+        dni_calc = DniCalculatorProxy(registry=registry)
+        assert list(dni_calc.find_registered_dnis("52407??Q")) == []
+        assert list(dni_calc.find_registered_dnis("052407??Q")) == [
+            Dni(5240727, "Q"),
+            Dni(5240773, "Q"),
+        ]
+
+    def test_proxy_find_registered_dnis_no_registry(self):
+        dni_calc = DniCalculatorProxy()
+        assert list(dni_calc.find_registered_dnis("052407??Q")) == []
+
+
+if __name__ == "__main__":
+    pytest.main()